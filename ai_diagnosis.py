@@ -2,14 +2,96 @@
 AI诊断模块 - SiliconFlow API集成版本
 与SiliconFlow大模型接入进行视力诊断分析
 """
+import hashlib
 import json
+import numpy as np
+import random
 import requests
 import time
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
 from typing import List, Tuple, Dict, Optional
 
+# 优先使用orjson序列化请求体和解析流式响应，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class LLMCache:
+    """AI诊断结果缓存（精确匹配，LRU淘汰 + 过期时间）"""
+
+    def __init__(self, max_entries: int = 128, default_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (expire_at, value)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(scope: str, model: str, temperature: float, prompt: str) -> str:
+        """根据接口配置、模型、温度和提示词生成缓存键"""
+        return hashlib.sha256(f"{scope}|{model}|{temperature}|{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expire_at, value = entry
+        if expire_at < time.monotonic():
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        """写入缓存"""
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+
 class AIVisionDiagnosis:
     """AI视力诊断类"""
-    
+
+    # 固定的系统提示词放在消息最前面，保持逐字节不变，便于服务端前缀缓存命中
+    _STATIC_SYSTEM_PROMPT = """作为专业的眼科医生，请根据用户提供的视力测试数据进行分析和诊断。
+
+请提供以下内容：
+1. 视力状况评估
+2. 可能的原因分析
+3. 建议的后续行动
+4. 日常护眼建议
+5. 是否需要进一步检查
+
+请用专业但易懂的语言回答，字数控制在300字以内。
+"""
+
+    # 批量诊断使用的系统提示词，要求模型按顺序返回JSON字符串数组
+    _BATCH_SYSTEM_PROMPT = _STATIC_SYSTEM_PROMPT + """
+用户会一次提供多位受试者的测试记录，以 [序号] 分隔。
+请为每位受试者分别给出诊断，并且只返回一个JSON字符串数组，数组长度与记录数相同、顺序一致，不要输出其他内容。
+"""
+
     def __init__(self, api_key: Optional[str] = None, model: str = "Qwen/Qwen3-8B",
                  progress_callback=None, stream_callback=None):
         """
@@ -27,30 +109,57 @@ class AIVisionDiagnosis:
         self.use_real_api = api_key is not None and len(api_key) > 10
         self.progress_callback = progress_callback
         self.stream_callback = stream_callback
+        self.temperature = 0.1
+        # 取消标记与当前进行中的响应，cancel() 据此中止阻塞的HTTP请求
+        self._cancelled = False
+        self._active_response = None
+
+        # 诊断结果缓存：低温度下相同输入的输出基本一致，可直接复用
+        # 缓存键包含接口地址与密钥的摘要，配置变化后不会复用旧配置下的结果
+        self.cache = LLMCache()
+        self._cache_scope = hashlib.sha256(
+            f"{self.api_url}|{self.api_key}".encode("utf-8")).hexdigest()
+
+        # 请求头只构建一次，作为Session的默认请求头随每次请求发送
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "User-Agent": "VisionTest/1.0"
+        }
 
-    def check_network_connection(self) -> bool:
-        """检查网络连接"""
+        # 复用同一个Session，保持到API服务器的长连接，避免每次请求重新握手
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+        self._session.headers.update(self._headers)
+
+    def close(self):
+        """关闭HTTP会话，释放连接池"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def cancel(self):
+        """取消进行中的诊断：关闭当前响应和连接池，使阻塞的请求立即出错返回（可从其他线程调用）"""
+        self._cancelled = True
+        response = self._active_response
+        if response is not None:
+            response.close()
+        if self._session is not None:
+            # Session关闭后仍可继续使用，连接池会在下次请求时重建
+            self._session.close()
+
+    def __del__(self):
         try:
-            # 尝试连接到SiliconFlow的基础URL
-            response = requests.get("https://api.siliconflow.cn", timeout=5)
-            return response.status_code in [200, 404]  # 404也表示能连接到服务器
-        except:
-            return False
+            self.close()
+        except Exception:
+            pass
 
     def test_api_connectivity(self) -> tuple[bool, str]:
         """测试API连接性"""
         if not self.use_real_api:
             return False, "未配置API密钥"
 
-        if not self.check_network_connection():
-            return False, "网络连接失败"
-
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
             # 使用最小的测试请求
             data = {
                 "model": self.model,
@@ -59,10 +168,9 @@ class AIVisionDiagnosis:
                 "stream": False
             }
 
-            response = requests.post(
+            response = self._session.post(
                 self.api_url,
-                headers=headers,
-                json=data,
+                data=_json_dumps(data),
                 timeout=10
             )
 
@@ -77,6 +185,8 @@ class AIVisionDiagnosis:
 
         except requests.exceptions.Timeout:
             return False, "API连接超时"
+        except requests.exceptions.ConnectionError:
+            return False, "网络连接失败"
         except Exception as e:
             return False, f"连接测试失败: {str(e)}"
         
@@ -95,48 +205,106 @@ class AIVisionDiagnosis:
         # 构建分析数据
         analysis_data = self.prepare_analysis_data(test_results, patient_info)
 
-        # 如果使用真实API，先进行连接性检查
-        if self.use_real_api:
-            print("🔍 正在检查API连接性...")
-            is_connected, connection_msg = self.test_api_connectivity()
-            if not is_connected:
-                print(f"❌ API连接检查失败: {connection_msg}")
-                return self.generate_fallback_diagnosis_with_error(f"API连接失败: {connection_msg}")
-            else:
-                print(f"✅ {connection_msg}")
-
         # 生成诊断提示词
         prompt = self.generate_diagnosis_prompt(analysis_data)
 
-        # 调用AI接口
+        # 调用AI接口（密钥无效、频率限制、超时等错误由call_ai_api统一处理，不再单独预检）
         try:
             diagnosis = self.call_ai_api(prompt)
+        except InterruptedError:
+            raise
         except Exception as e:
             print(f"AI接口调用失败: {e}")
             diagnosis = self.generate_fallback_diagnosis(analysis_data)
 
         return diagnosis
     
+    def batch_analyze(self, batch: List[Tuple[List[Tuple[float, bool]], Dict]]) -> List[str]:
+        """
+        批量分析多位受试者的视力测试结果，合并为一次AI调用
+
+        Args:
+            batch: [(test_results, patient_info), ...]
+
+        Returns:
+            List[str]: 与输入顺序一致的诊断报告列表
+        """
+        if not batch:
+            return []
+
+        if not self.use_real_api or len(batch) == 1:
+            return self._analyze_sequentially(batch)
+
+        analysis_list = [self.prepare_analysis_data(test_results, patient_info)
+                         for test_results, patient_info in batch]
+        records = [f"[{i}]\n{self.generate_diagnosis_prompt(analysis_data)}"
+                   for i, analysis_data in enumerate(analysis_list, 1)]
+
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self._BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"共{len(batch)}条测试记录：\n\n" + "\n\n".join(records)}
+            ],
+            "stream": False,
+            "max_tokens": 300 * len(batch),
+            "temperature": self.temperature,
+            "top_p": 0.7
+        }
+
+        try:
+            progress_msg = f"正在批量调用AI诊断服务... 共{len(batch)}条记录"
+            print(progress_msg)
+            if self.progress_callback:
+                self.progress_callback(progress_msg)
+
+            response = self._session.post(
+                self.api_url,
+                data=_json_dumps(data),
+                timeout=60
+            )
+            response.raise_for_status()
+
+            content = response.json()['choices'][0]['message']['content']
+            # 模型可能在JSON外包裹代码块等内容，只截取数组部分
+            diagnoses = _json_loads(content[content.index('['):content.rindex(']') + 1])
+            if (not isinstance(diagnoses, list) or len(diagnoses) != len(batch) or
+                    not all(isinstance(d, str) for d in diagnoses)):
+                raise ValueError("批量诊断结果数量或格式不匹配")
+
+            print(f"✅ 批量AI诊断获取成功（{len(diagnoses)}条）")
+            return diagnoses
+
+        except Exception as e:
+            print(f"⚠️ 批量AI诊断失败，改为逐条诊断: {e}")
+            return self._analyze_sequentially(batch)
+
+    def _analyze_sequentially(self, batch: List[Tuple[List[Tuple[float, bool]], Dict]]) -> List[str]:
+        """逐条诊断（批量调用失败时的回退方案）"""
+        return [self.analyze_vision_results(test_results, patient_info)
+                for test_results, patient_info in batch]
+
     def prepare_analysis_data(self, test_results: List[Tuple[float, bool]], 
                             patient_info: Dict = None) -> Dict:
         """准备分析数据"""
         if not test_results:
             return {"error": "无测试数据"}
         
-        # 计算统计信息
+        # 一次性转换为数组，向量化计算统计信息（成功标记转换为0/1）
+        arr = np.asarray(test_results, dtype=np.float64)
+        successful_mask = arr[:, 1].astype(bool)
+        successful_visions = arr[successful_mask, 0]
+
         total_tests = len(test_results)
-        successful_tests = sum(1 for _, success in test_results if success)
+        successful_tests = int(successful_mask.sum())
         success_rate = successful_tests / total_tests if total_tests > 0 else 0
-        
+
         # 找到最高成功视力值
-        max_successful_vision = 0
-        for vision_value, success in test_results:
-            if success and vision_value > max_successful_vision:
-                max_successful_vision = vision_value
-        
+        max_successful_vision = float(successful_visions.max()) if successful_visions.size else 0
+
         # 分析视力趋势
-        vision_trend = self.analyze_vision_trend(test_results)
-        
+        vision_trend = self.analyze_vision_trend(test_results, successful_visions)
+
         analysis_data = {
             "total_tests": total_tests,
             "successful_tests": successful_tests,
@@ -149,57 +317,53 @@ class AIVisionDiagnosis:
         
         return analysis_data
     
-    def analyze_vision_trend(self, test_results: List[Tuple[float, bool]]) -> str:
+    def analyze_vision_trend(self, test_results: List[Tuple[float, bool]],
+                             successful_visions: Optional[np.ndarray] = None) -> str:
         """分析视力变化趋势"""
         if len(test_results) < 2:
             return "数据不足"
-        
-        successful_visions = [vision for vision, success in test_results if success]
-        
-        if len(successful_visions) < 2:
+
+        if successful_visions is None:
+            arr = np.asarray(test_results, dtype=np.float64)
+            successful_visions = arr[arr[:, 1].astype(bool), 0]
+
+        if successful_visions.size < 2:
             return "成功测试数据不足"
-        
-        if successful_visions[-1] > successful_visions[0]:
+
+        trend = np.sign(successful_visions[-1] - successful_visions[0])
+        if trend > 0:
             return "视力呈上升趋势"
-        elif successful_visions[-1] < successful_visions[0]:
+        elif trend < 0:
             return "视力呈下降趋势"
         else:
             return "视力保持稳定"
-    
+
     def generate_diagnosis_prompt(self, analysis_data: Dict) -> str:
-        """生成AI诊断提示词"""
-        prompt = f"""
-作为专业的眼科医生，请根据以下视力测试数据进行分析和诊断：
-
-测试统计：
-- 总测试次数: {analysis_data['total_tests']}
-- 成功测试次数: {analysis_data['successful_tests']}
-- 成功率: {analysis_data['success_rate']:.2%}
-- 最高成功视力值: {analysis_data['max_successful_vision']}
-- 视力趋势: {analysis_data['vision_trend']}
-
-详细测试结果：
-"""
-        
+        """生成AI诊断提示词（仅包含本次测试的动态数据，固定说明见_STATIC_SYSTEM_PROMPT）"""
+        return self._format_dynamic_tail(analysis_data)
+
+    def _format_dynamic_tail(self, analysis_data: Dict) -> str:
+        """格式化本次测试数据，作为提示词的动态部分放在最后"""
+        lines = [
+            "测试统计：",
+            f"- 总测试次数: {analysis_data['total_tests']}",
+            f"- 成功测试次数: {analysis_data['successful_tests']}",
+            f"- 成功率: {analysis_data['success_rate']:.2%}",
+            f"- 最高成功视力值: {analysis_data['max_successful_vision']}",
+            f"- 视力趋势: {analysis_data['vision_trend']}",
+            "",
+            "详细测试结果：",
+        ]
+
         for i, (vision, success) in enumerate(analysis_data['test_results']):
             status = "成功" if success else "失败"
-            prompt += f"- 测试{i+1}: 视力{vision} - {status}\n"
-        
-        prompt += """
-请提供以下内容：
-1. 视力状况评估
-2. 可能的原因分析
-3. 建议的后续行动
-4. 日常护眼建议
-5. 是否需要进一步检查
+            lines.append(f"- 测试{i+1}: 视力{vision} - {status}")
+
+        return "\n".join(lines)
 
-请用专业但易懂的语言回答，字数控制在300字以内。
-"""
-        
-        return prompt
-    
     def call_ai_api(self, prompt: str) -> str:
         """调用SiliconFlow API进行AI诊断（优化版本）"""
+        self._cancelled = False
         if not self.use_real_api:
             print("使用模拟诊断（未配置API密钥）")
             return self.generate_mock_diagnosis()
@@ -207,13 +371,27 @@ class AIVisionDiagnosis:
         # 记录开始时间
         start_time = time.time()
 
-        # 多次重试机制，使用更长的超时时间
-        max_retries = 2  # 减少重试次数，但使用更长超时
-        timeout_values = [30, 60]  # 更长的超时时间
+        # 仅在低温度（输出基本确定）时使用缓存
+        user_content = prompt[:500]
+        use_cache = self.temperature <= 0.2
+        cache_key = LLMCache.make_key(self._cache_scope, self.model, self.temperature, user_content)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("✅ AI诊断命中缓存")
+                return cached
+
+        # 多次重试机制：首次使用较短超时，只有在超时失败后才放宽超时时间
+        max_retries = 3
+        timeout_values = [10, 30, 60]
+        timeout_level = 0
 
         for attempt in range(max_retries):
+            # 已取消时不再重试（取消导致的连接错误会落到下一轮这里）
+            if self._cancelled:
+                raise InterruptedError("AI诊断已取消")
             try:
-                timeout = timeout_values[attempt]
+                timeout = timeout_values[timeout_level]
                 progress_msg = f"正在调用AI诊断服务... 尝试 {attempt + 1}/{max_retries} (预计等待: {timeout}秒)"
                 print(progress_msg)
 
@@ -221,35 +399,27 @@ class AIVisionDiagnosis:
                 if self.progress_callback:
                     self.progress_callback(progress_msg)
 
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                    "User-Agent": "VisionTest/1.0"
-                }
-
                 # 简化的请求数据，启用流式传输
                 use_stream = self.stream_callback is not None
                 data = {
                     "model": self.model,
                     "messages": [
-                        {
-                            "role": "user",
-                            "content": f"作为眼科医生，简要分析视力测试结果并给出建议（200字内）：{prompt[:500]}"
-                        }
+                        {"role": "system", "content": self._STATIC_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_content}
                     ],
                     "stream": use_stream,  # 根据是否有回调决定是否使用流式
                     "max_tokens": 300,
-                    "temperature": 0.1,
+                    "temperature": self.temperature,
                     "top_p": 0.7
                 }
 
-                response = requests.post(
+                response = self._session.post(
                     self.api_url,
-                    headers=headers,
-                    json=data,
+                    data=_json_dumps(data),
                     timeout=timeout,
                     stream=use_stream  # 启用流式响应
                 )
+                self._active_response = response
 
                 if response.status_code == 200:
                     if use_stream:
@@ -257,6 +427,8 @@ class AIVisionDiagnosis:
                         diagnosis = self.handle_stream_response(response)
                         if diagnosis:
                             print("✅ AI诊断获取成功（流式）")
+                            if use_cache:
+                                self.cache.set(cache_key, diagnosis)
                             return diagnosis
                         else:
                             print("⚠️ 流式响应处理失败")
@@ -269,6 +441,8 @@ class AIVisionDiagnosis:
                         if 'choices' in result and len(result['choices']) > 0:
                             diagnosis = result['choices'][0]['message']['content']
                             print("✅ AI诊断获取成功")
+                            if use_cache:
+                                self.cache.set(cache_key, diagnosis)
                             return diagnosis
                         else:
                             print("⚠️ API响应格式异常")
@@ -285,9 +459,7 @@ class AIVisionDiagnosis:
                     error_msg = "API调用频率限制，请稍后重试"
                     print(f"⚠️ {error_msg}")
                     if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"等待 {wait_time} 秒后重试...")
-                        time.sleep(wait_time)  # 指数退避
+                        self._backoff(attempt)
                         continue
                     return self.generate_fallback_diagnosis_with_error(error_msg)
 
@@ -304,6 +476,8 @@ class AIVisionDiagnosis:
                     print(f"⚠️ {error_msg}")
                     if attempt == max_retries - 1:
                         return self.generate_fallback_diagnosis_with_error(error_msg)
+                    if response.status_code >= 500:
+                        self._backoff(attempt)
                     continue
 
             except requests.exceptions.Timeout:
@@ -311,6 +485,8 @@ class AIVisionDiagnosis:
                 print(f"⏰ {error_msg}")
                 if attempt == max_retries - 1:
                     return self.generate_fallback_diagnosis_with_error("API调用超时，请检查网络连接")
+                # 仅在超时后放宽下一次的超时时间
+                timeout_level = min(timeout_level + 1, len(timeout_values) - 1)
                 continue
 
             except requests.exceptions.ConnectionError:
@@ -327,6 +503,9 @@ class AIVisionDiagnosis:
                     return self.generate_fallback_diagnosis_with_error(error_msg)
                 continue
 
+            except InterruptedError:
+                # 诊断已取消，不再重试
+                raise
             except Exception as e:
                 error_msg = f"API调用异常: {str(e)}"
                 print(f"❌ {error_msg}")
@@ -337,67 +516,73 @@ class AIVisionDiagnosis:
         # 如果所有重试都失败了
         return self.generate_fallback_diagnosis_with_error("多次重试后仍然失败，请稍后再试")
 
+    def _backoff(self, attempt: int):
+        """指数退避并加入随机抖动，避免多个客户端同时重试"""
+        wait_time = (2 ** attempt) + random.uniform(0, 1)
+        print(f"等待 {wait_time:.1f} 秒后重试...")
+        time.sleep(wait_time)
+
     def handle_stream_response(self, response) -> str:
         """处理流式响应"""
         try:
-            import json
-
-            full_content = ""
+            content_parts = []
 
             # 通知开始流式输出
             if self.stream_callback:
                 self.stream_callback("开始接收AI诊断结果...\n\n", is_start=True)
 
-            # 处理流式数据
+            # 处理流式数据（直接在bytes上判断前缀，避免逐行解码）
             for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-
-                    # 跳过非数据行
-                    if not line.startswith('data: '):
-                        continue
+                if not line:
+                    continue
 
-                    # 移除 'data: ' 前缀
-                    data_str = line[6:]
+                # 跳过非数据行
+                if not line.startswith(b'data: '):
+                    continue
 
-                    # 检查是否是结束标记
-                    if data_str.strip() == '[DONE]':
-                        break
+                # 移除 'data: ' 前缀
+                data_str = line[6:]
 
-                    try:
-                        # 解析JSON数据
-                        data = json.loads(data_str)
+                # 检查是否是结束标记
+                if data_str.strip() == b'[DONE]':
+                    break
 
-                        # 提取内容
-                        if 'choices' in data and len(data['choices']) > 0:
-                            delta = data['choices'][0].get('delta', {})
-                            content = delta.get('content', '')
+                try:
+                    # 解析JSON数据
+                    data = _json_loads(data_str)
+                except ValueError:
+                    # 跳过无法解析的行
+                    continue
 
-                            if content:
-                                full_content += content
+                # 提取内容
+                if 'choices' in data and len(data['choices']) > 0:
+                    delta = data['choices'][0].get('delta', {})
+                    content = delta.get('content', '')
 
-                                # 实时回调显示内容
-                                if self.stream_callback:
-                                    self.stream_callback(content, is_chunk=True)
+                    if content:
+                        content_parts.append(content)
 
-                                # 也在控制台显示（可选）
-                                print(content, end='', flush=True)
+                        # 实时回调显示内容
+                        if self.stream_callback:
+                            self.stream_callback(content, is_chunk=True)
 
-                    except json.JSONDecodeError:
-                        # 跳过无法解析的行
-                        continue
+                        # 也在控制台显示（可选）
+                        print(content, end='', flush=True)
 
             # 通知流式输出结束
             if self.stream_callback:
                 self.stream_callback("", is_end=True)
 
             print()  # 换行
-            return full_content.strip()
+            return ''.join(content_parts).strip()
 
+        except InterruptedError:
+            # 调用方取消诊断，交给上层结束，不当作可重试的失败
+            raise
         except Exception as e:
             print(f"流式响应处理错误: {e}")
             return None
-    
+
     def generate_fallback_diagnosis_with_error(self, error_msg: str) -> str:
         """生成包含错误信息的备用诊断"""
         return f"""
@@ -2,13 +2,21 @@
 集成手势识别的摄像头处理模块 - 优化版本
 实时显示手指方向
 """
+import queue
+import threading
+import time
+from collections import deque
+
 import cv2
 import numpy as np
 import mediapipe as mp
-from PySide6.QtCore import QThread, Signal
+from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QImage, QPixmap
 
-from shou import get_finger_direction, is_index_finger_extended
+from shou import extract_finger_features, get_finger_direction, is_index_finger_extended
+
+# Qt 5.14+ 支持直接使用BGR888格式，可省去BGR->RGB的颜色转换
+_HAS_BGR888 = hasattr(QImage.Format, "Format_BGR888")
 
 class CameraWithGestureHandler(QThread):
     """集成手势识别的摄像头处理器"""
@@ -18,6 +26,9 @@ class CameraWithGestureHandler(QThread):
     distance_updated = Signal(float)
     finger_direction_detected = Signal(str)  # 新增：手指方向信号
     gesture_status_changed = Signal(str)     # 新增：手势状态信号
+
+    # MediaPipe Hands模型加载较慢，在所有处理器实例间共享，摄像头重启时无需重新初始化
+    _shared_hands = None
     
     def __init__(self, camera_index=0, resolution=None, fps=30, exposure=100, brightness=128, contrast=128):
         super().__init__()
@@ -37,15 +48,34 @@ class CameraWithGestureHandler(QThread):
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_hands = mp.solutions.hands
         self.hands = None
+        # 手势识别输入宽度：先缩小再推理，关键点为归一化坐标，可直接映射回原分辨率
+        self.inference_width = 320
+
+        # 跳帧推理：每隔inference_stride帧做一次手势识别，其余帧复用上次的关键点
+        self._inference_stride = 2
+        self._frame_counter = 0
+        self._last_landmarks = None
+        self._last_inference_time = 0.0
+        self._landmarks_max_age = 0.2  # 缓存关键点最长复用时间（秒）
+        # 手势相关的文字提示 [(text, pos, scale, color, thickness), ...]，跳帧时直接重绘
+        self._gesture_overlay = []
+
+        # 静态叠加层（测试区域框和标签）：首帧确定尺寸后渲染一次，之后只拷贝非零像素
+        self._static_overlay = None
+        self._test_area_size, _ = cv2.getTextSize("Test Area", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+
+        # 采集与识别分离：采集线程只负责读帧，队列只保留最新一帧，识别总是处理最新画面
+        self._frame_queue = queue.Queue(maxsize=1)
+        self._capture_thread = None
 
         # 手势识别状态
         self.current_direction = "None"
         self.finger_extended = False
 
         # 优化：减少稳定性检测的帧数要求
-        self.direction_history = []
         self.direction_stable_count = 0
         self.required_stable_frames = 3  # 减少到3帧提高响应速度
+        self.direction_history = deque(maxlen=self.required_stable_frames)
 
         # 预定义常用颜色，避免重复创建
         self.colors = {
@@ -60,13 +90,8 @@ class CameraWithGestureHandler(QThread):
     def start_camera(self):
         """启动摄像头"""
         try:
-            # 初始化MediaPipe
-            self.hands = self.mp_hands.Hands(
-                static_image_mode=False,
-                max_num_hands=1,
-                min_detection_confidence=0.75,
-                min_tracking_confidence=0.75
-            )
+            # 初始化MediaPipe（复用已加载的模型）
+            self.hands = self._ensure_hands()
 
             # 初始化摄像头
             self.cap = cv2.VideoCapture(self.camera_index)
@@ -84,6 +109,8 @@ class CameraWithGestureHandler(QThread):
             self.cap.set(cv2.CAP_PROP_CONTRAST, self.contrast / 255.0)      # 归一化到0-1
 
             self.running = True
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
             self.start()
             return True
 
@@ -93,26 +120,55 @@ class CameraWithGestureHandler(QThread):
     def stop_camera(self):
         """停止摄像头"""
         self.running = False
+        # 先等待采集线程退出，避免在cap.read()过程中释放摄像头
+        if self._capture_thread:
+            self._capture_thread.join()
+            self._capture_thread = None
         if self.cap:
             self.cap.release()
-        if self.hands:
-            self.hands.close()
+        # 不关闭共享的Hands实例，下次启动时直接复用
         self.wait()
+
+    def _ensure_hands(self):
+        """获取共享的MediaPipe Hands实例，首次使用时创建"""
+        cls = CameraWithGestureHandler
+        if cls._shared_hands is None:
+            cls._shared_hands = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=1,
+                min_detection_confidence=0.75,
+                min_tracking_confidence=0.75
+            )
+        return cls._shared_hands
+
+    @classmethod
+    def shutdown(cls):
+        """释放共享的MediaPipe Hands实例（程序退出时调用）"""
+        if cls._shared_hands is not None:
+            cls._shared_hands.close()
+            cls._shared_hands = None
     
-    def run(self):
-        """摄像头线程主循环"""
+    def _capture_loop(self):
+        """采集线程：持续读帧并放入队列，队列已满时丢弃旧帧"""
         retry_count = 0
         max_retries = 5
         
+        frame_interval = 1.0 / self.fps if self.fps else 0.0
+        
         while self.running and self.cap:
+            loop_start = time.monotonic()
             try:
                 ret, frame = self.cap.read()
                 if ret and frame is not None and frame.size > 0:
-                    # 处理帧（包括手势识别）
-                    processed_frame = self.process_frame_with_gesture(frame)
-                    
-                    # 发送处理后的帧
-                    self.frame_ready.emit(processed_frame)
+                    try:
+                        self._frame_queue.put_nowait(frame)
+                    except queue.Full:
+                        # 丢弃尚未处理的旧帧，只保留最新一帧
+                        try:
+                            self._frame_queue.get_nowait()
+                        except queue.Empty:
+                            pass
+                        self._frame_queue.put_nowait(frame)
                     retry_count = 0  # 重置重试计数
                 else:
                     retry_count += 1
@@ -125,78 +181,128 @@ class CameraWithGestureHandler(QThread):
             except Exception:
                 retry_count += 1
                 if retry_count >= max_retries:
+                    self.running = False
                     break
             
-            self.msleep(33)  # 约30fps
+            # 只补足剩余的帧间隔；cap.read()本身会阻塞等待新帧，处理较慢时不再额外等待
+            sleep_s = frame_interval - (time.monotonic() - loop_start)
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+    
+    def run(self):
+        """摄像头线程主循环：从队列取最新帧进行手势识别并发送"""
+        retry_count = 0
+        max_retries = 5
+        
+        while self.running:
+            try:
+                frame = self._frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                # 处理帧（包括手势识别）
+                processed_frame = self.process_frame_with_gesture(frame)
+                
+                # 发送处理后的帧；仅在非连续内存时整理一次，UI端即可零拷贝包装
+                if not processed_frame.flags['C_CONTIGUOUS']:
+                    processed_frame = np.ascontiguousarray(processed_frame)
+                self.frame_ready.emit(processed_frame)
+                retry_count = 0  # 重置重试计数
+
+            except Exception:
+                retry_count += 1
+                if retry_count >= max_retries:
+                    self.running = False
+                    break
     
     def process_frame_with_gesture(self, frame):
         """处理帧并进行手势识别"""
         # 水平翻转画面（镜像效果）
         frame = cv2.flip(frame, 1)
         
-        # 转换颜色空间用于MediaPipe处理
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # 进行手势识别
-        results = self.hands.process(frame_rgb)
-        
-        # 转换回BGR用于显示
-        frame_bgr = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2BGR)
-        
-        # 处理手势识别结果
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # 绘制手部关键点
+        height, width = frame.shape[:2]
+
+        # 判断本帧是否需要推理（缓存过旧时强制推理）
+        self._frame_counter += 1
+        run_inference = (self._frame_counter % self._inference_stride == 0 or
+                         time.monotonic() - self._last_inference_time > self._landmarks_max_age)
+
+        if run_inference:
+            # 缩小后再转换颜色空间用于MediaPipe处理（只读副本，绘制直接在原分辨率BGR帧上进行）
+            if width > self.inference_width:
+                small_size = (self.inference_width, int(height * self.inference_width / width))
+                small = cv2.resize(frame, small_size, interpolation=cv2.INTER_LINEAR)
+            else:
+                small = frame
+            frame_rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+            # 进行手势识别
+            results = self.hands.process(frame_rgb)
+            self._last_landmarks = results.multi_hand_landmarks
+            self._last_inference_time = time.monotonic()
+            self._gesture_overlay = []
+
+            # 处理手势识别结果
+            if results.multi_hand_landmarks:
+                for hand_landmarks in results.multi_hand_landmarks:
+                    # 提取手部关键点坐标，得到 (21, 2) 数组，按 [i][0] / [i][1] 访问与原列表一致
+                    hand_local = np.fromiter(
+                        (v for lm in hand_landmarks.landmark for v in (lm.x, lm.y)),
+                        dtype=np.float32, count=42).reshape(21, 2)
+                    hand_local *= (width, height)
+
+                    # 进行手势分析
+                    self.analyze_gesture(hand_local, frame)
+            else:
+                # 没有检测到手部
+                self.finger_extended = False
+                self.current_direction = "None"
+                self.direction_history.clear()
+                self.direction_stable_count = 0
+
+                # 显示提示信息
+                self._gesture_overlay = [
+                    ("Show your hand to camera", (50, 50), 1, (255, 255, 255), 2)
+                ]
+
+                # 发送状态信号
+                self.gesture_status_changed.emit("No hand detected")
+
+        # 绘制手部关键点（跳帧时使用缓存的关键点）
+        if self._last_landmarks:
+            for hand_landmarks in self._last_landmarks:
                 self.mp_drawing.draw_landmarks(
-                    frame_bgr, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-                
-                # 提取手部关键点坐标
-                hand_local = []
-                for i in range(21):
-                    x = hand_landmarks.landmark[i].x * frame_bgr.shape[1]
-                    y = hand_landmarks.landmark[i].y * frame_bgr.shape[0]
-                    hand_local.append((x, y))
-                
-                # 进行手势分析
-                self.analyze_gesture(hand_local, frame_bgr)
-        else:
-            # 没有检测到手部
-            self.finger_extended = False
-            self.current_direction = "None"
-            self.direction_history.clear()
-            self.direction_stable_count = 0
-            
-            # 显示提示信息
-            cv2.putText(frame_bgr, "Show your hand to camera", (50, 50), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            
-            # 发送状态信号
-            self.gesture_status_changed.emit("No hand detected")
-        
+                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+
+        for text, pos, scale, color, thickness in self._gesture_overlay:
+            self._put(frame, text, pos, scale, color, thickness)
+
         # 添加距离信息和其他信息
-        frame_with_info = self.add_info_to_frame(frame_bgr)
+        frame_with_info = self.add_info_to_frame(frame)
         
         return frame_with_info
     
     def analyze_gesture(self, hand_landmarks, frame):
         """分析手势"""
         try:
+            # 只提取一次关键点，供伸指判断和方向判断共用
+            features = extract_finger_features(hand_landmarks)
+
             # 检测食指是否伸出
-            finger_extended = is_index_finger_extended(hand_landmarks)
+            finger_extended = is_index_finger_extended(features)
             self.finger_extended = finger_extended
             
             if finger_extended:
                 # 获取食指指向方向
-                direction = get_finger_direction(hand_landmarks)
+                direction = get_finger_direction(features)
                 
-                # 方向稳定性检测
+                # 方向稳定性检测（deque满时自动淘汰最旧的记录）
                 self.direction_history.append(direction)
-                if len(self.direction_history) > self.required_stable_frames:
-                    self.direction_history.pop(0)
                 
                 # 检查方向是否稳定
                 if len(self.direction_history) >= self.required_stable_frames:
-                    if all(d == direction for d in self.direction_history):
+                    if self.direction_history.count(direction) == self.required_stable_frames:
                         # 方向稳定
                         if self.current_direction != direction:
                             self.current_direction = direction
@@ -215,10 +321,10 @@ class CameraWithGestureHandler(QThread):
                 display_text = f"Direction: {direction}"
                 confidence_text = f"Stable: {len(self.direction_history)}/{self.required_stable_frames}"
                 
-                cv2.putText(frame, display_text, (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 0), 3)
-                cv2.putText(frame, confidence_text, (50, 100), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+                self._gesture_overlay = [
+                    (display_text, (50, 50), 1.5, (0, 255, 0), 3),
+                    (confidence_text, (50, 100), 0.8, (0, 255, 255), 2)
+                ]
                 
                 # 发送状态信号
                 status = f"Pointing {direction} (Stable: {self.direction_stable_count})"
@@ -230,8 +336,9 @@ class CameraWithGestureHandler(QThread):
                 self.direction_history.clear()
                 self.direction_stable_count = 0
                 
-                cv2.putText(frame, "Point with index finger", (50, 50), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+                self._gesture_overlay = [
+                    ("Point with index finger", (50, 50), 1, (255, 255, 0), 2)
+                ]
                 
                 self.gesture_status_changed.emit("Index finger not extended")
                 
@@ -255,23 +362,39 @@ class CameraWithGestureHandler(QThread):
         ]
 
         for text, pos, scale, color in texts:
-            cv2.putText(frame, text, pos, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+            self._put(frame, text, pos, scale, color)
+
+        # 添加测试区域指示框（静态内容，使用缓存的叠加层）
+        if self._static_overlay is None or self._static_overlay[0] != (height, width):
+            self._static_overlay = self._build_static_overlay(height, width)
+        _, ys, xs, values = self._static_overlay
+        frame[ys, xs] = values
 
-        # 添加测试区域指示框
+        return frame
+    
+    @staticmethod
+    def _put(frame, text, pos, scale, color, thickness=2):
+        """使用统一字体绘制文字"""
+        cv2.putText(frame, text, pos, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+
+    def _build_static_overlay(self, height, width):
+        """渲染静态叠加层，返回 (尺寸, 行索引, 列索引, 像素值)"""
+        overlay = np.zeros((height, width, 3), dtype=np.uint8)
         center_x, center_y = width // 2, height // 2
         box_size = 100
 
-        cv2.rectangle(frame,
+        cv2.rectangle(overlay,
                      (center_x - box_size, center_y - box_size),
                      (center_x + box_size, center_y + box_size),
                      self.colors['yellow'], 2)
 
-        cv2.putText(frame, "Test Area",
-                   (center_x - 50, center_y + box_size + 20),
+        cv2.putText(overlay, "Test Area",
+                   (center_x - self._test_area_size[0] // 2, center_y + box_size + 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.colors['yellow'], 1)
 
-        return frame
-    
+        ys, xs = np.nonzero(overlay.any(axis=2))
+        return (height, width), ys, xs, overlay[ys, xs]
+
     def reinitialize_camera(self):
         """重新初始化摄像头"""
         try:
@@ -311,15 +434,33 @@ class CameraWithGestureHandler(QThread):
         """检查食指是否伸出"""
         return self.finger_extended
     
-    def numpy_to_qimage(self, frame):
-        """将numpy数组转换为QImage"""
+    def _wrap_qimage(self, frame):
+        """直接包装numpy缓冲区为QImage（不拷贝，调用方需保证frame在使用期间有效）"""
         height, width, _ = frame.shape
-        bytes_per_line = 3 * width
+        if _HAS_BGR888:
+            return QImage(frame.data, width, height, frame.strides[0], QImage.Format.Format_BGR888), frame
+        # 旧版Qt不支持BGR888，回退到RGB转换
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        q_image = QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
-        return q_image
+        return QImage(frame_rgb.data, width, height, frame_rgb.strides[0], QImage.Format.Format_RGB888), frame_rgb
+
+    def numpy_to_qimage(self, frame):
+        """将numpy数组转换为QImage"""
+        q_image, _buffer = self._wrap_qimage(np.ascontiguousarray(frame))
+        # QImage不持有numpy缓冲区，拷贝一份以保证返回值独立有效
+        return q_image.copy()
     
     def numpy_to_qpixmap(self, frame):
         """将numpy数组转换为QPixmap"""
-        q_image = self.numpy_to_qimage(frame)
+        # fromImage会立即拷贝像素数据，因此无需先拷贝QImage
+        q_image, _buffer = self._wrap_qimage(np.ascontiguousarray(frame))
         return QPixmap.fromImage(q_image)
+
+    def numpy_to_scaled_qpixmap(self, frame, size):
+        """将numpy数组按目标尺寸（保持比例）缩放后转换为QPixmap
+
+        先在零拷贝包装的QImage上缩放，只把缩放后的图像转换为QPixmap
+        """
+        q_image, _buffer = self._wrap_qimage(np.ascontiguousarray(frame))
+        scaled = q_image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                                Qt.TransformationMode.FastTransformation)
+        return QPixmap.fromImage(scaled)
@@ -2,25 +2,245 @@
 通信模块
 处理与下位机的串口通信
 """
-import serial
+import functools
 import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import selectors
+import sys
 import threading
 import time
-from PySide6.QtCore import QObject, Signal
+import numpy as np
+from PySide6.QtCore import QObject, Signal, QTimer
+
+# 优先使用orjson解析JSON数据，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# 合法的方向取值（字符串已驻留，集合查找为O(1)且无需每次构建列表）
+_DIRECTIONS = frozenset(map(sys.intern, ("Up", "Down", "Left", "Right")))
+_DIRECTIONS_TUPLE = tuple(sorted(_DIRECTIONS))
+
+# 串口子进程统一用spawn方式启动：主进程中已有多个线程（摄像头、AI诊断等），
+# fork会把持有中的锁和Qt状态复制到子进程中导致死锁；spawn在Windows与Linux下行为一致
+_MP_CTX = multiprocessing.get_context("spawn")
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_cmd(command):
+    """编码下位机命令（命令种类很少，缓存编码结果避免重复分配）"""
+    return f"{command}\n".encode('utf-8')
+
+
+def _handle_dir(payload):
+    """处理 DIR:<方向> 格式"""
+    direction = payload.strip()
+    if direction in _DIRECTIONS:
+        return ("dir", direction)
+    return None
+
+
+def _handle_dist(payload):
+    """处理 DIST:<距离> 格式"""
+    try:
+        return ("dist", float(payload.strip()))
+    except ValueError:
+        return None
+
+
+# 简单文本格式的前缀分发表，按冒号前的前缀一次查表
+_PREFIX_HANDLERS = {
+    "DIR": _handle_dir,
+    "DIST": _handle_dist,
+}
+
+
+def _parse_line(data):
+    """
+    解析一行下位机数据（纯函数，可在子进程中使用）
+
+    Returns:
+        ("dir", 方向) / ("dist", 距离)，无法识别时返回None
+    """
+    try:
+        if data.startswith("{"):
+            # JSON格式: {"type": "direction", "value": "Right"}
+            parsed_data = _json_loads(data)
+            msg_type = parsed_data.get("type")
+            value = parsed_data.get("value")
+            
+            if msg_type == "direction":
+                if value in _DIRECTIONS:
+                    return ("dir", value)
+            
+            elif msg_type == "distance":
+                distance = float(value if value is not None else 0)
+                if 0 < distance < 1000:  # 合理的距离范围
+                    return ("dist", distance)
+            return None
+
+        # 简单文本格式，这类数据无需经过JSON解析
+        sep = data.find(":")
+        if sep > 0:
+            handler = _PREFIX_HANDLERS.get(data[:sep])
+            if handler is not None:
+                return handler(data[sep + 1:])
+                
+    except ValueError:
+        # JSON格式错误，忽略该行
+        pass
+    except Exception as e:
+        logger.debug("解析数据错误: %s", e)
+    return None
+
+
+# 串口单次读取的最大字节数
+_READ_BLOCK_SIZE = 4096
+
+
+class SerialReaderProcess(_MP_CTX.Process):
+    """
+    串口读取子进程
+    子进程拥有独立的GIL，串口读取和解析不会与Qt主线程争用；
+    解析结果以小元组形式通过队列发回主进程
+    """
+
+    def __init__(self, port, baudrate, data_queue, command_queue, stop_event):
+        super().__init__(daemon=True)
+        self.port = port
+        self.baudrate = baudrate
+        self.data_queue = data_queue
+        self.command_queue = command_queue
+        self.stop_event = stop_event
+
+    def run(self):
+        try:
+            # pyserial只在串口子进程中使用，延迟导入
+            import serial
+            serial_conn = serial.Serial(
+                port=self.port,
+                baudrate=self.baudrate,
+                timeout=0.1  # 较短的读超时，保证断开连接时读进程能及时退出
+            )
+        except Exception as e:
+            self.data_queue.put(("error", str(e)))
+            return
+
+        self.data_queue.put(("connected", None))
+        try:
+            self.read_data(serial_conn)
+        finally:
+            serial_conn.close()
+
+    def read_data(self, serial_conn):
+        """读取串口数据（批量读取到缓冲区，按换行切分出完整消息）"""
+        buf = bytearray()
+        selector = None
+        if platform.system() == "Linux":
+            # Linux下直接在串口fd上等待可读事件（epoll），便于后续复用同一线程监听其他事件源
+            selector = selectors.DefaultSelector()
+            selector.register(serial_conn.fileno(), selectors.EVENT_READ)
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    # 先发送主进程排队的命令
+                    while True:
+                        try:
+                            serial_conn.write(self.command_queue.get_nowait())
+                        except queue.Empty:
+                            break
+
+                    if selector is not None:
+                        chunk = self._read_ready(selector)
+                        if chunk == b'':
+                            # fd可读却读不到数据：设备已拔出或挂断
+                            self.data_queue.put(("disconnected", "串口已断开"))
+                            break
+                    else:
+                        # 一次读出所有已到达的字节（单次最多_READ_BLOCK_SIZE）；没有数据时阻塞等待，超时返回空串
+                        # read(n)在等待内核数据时会释放GIL；不使用read_until，它在Python层逐字节读取
+                        chunk = serial_conn.read(min(max(1, serial_conn.in_waiting), _READ_BLOCK_SIZE))
+                    if not chunk:
+                        continue
+                    buf.extend(chunk)
+
+                    # 只处理完整的行，不完整的尾部留在缓冲区等待后续数据
+                    while True:
+                        end = buf.find(b'\n')
+                        if end < 0:
+                            break
+                        line = buf[:end].decode('utf-8', 'replace').strip()
+                        del buf[:end + 1]
+                        if line:
+                            record = _parse_line(line)
+                            if record is not None:
+                                self.data_queue.put(record)
+                except Exception as e:
+                    logger.warning("读取串口数据错误: %s", e)
+                    self.data_queue.put(("disconnected", str(e)))
+                    break
+        finally:
+            if selector is not None:
+                selector.close()
+
+    @staticmethod
+    def _read_ready(selector, timeout=0.1):
+        """等待任一已注册的fd可读并读取数据；超时返回None，读到EOF（设备断开）返回空串"""
+        for key, _ in selector.select(timeout=timeout):
+            return os.read(key.fd, _READ_BLOCK_SIZE)
+        return None
+
 
 class SerialCommunication(QObject):
     # 信号定义
     finger_direction_received = Signal(str)  # 手指方向信号
     distance_received = Signal(float)        # 距离信号
     connection_status_changed = Signal(bool) # 连接状态信号
+
+    # 等待子进程报告串口打开结果的最长时间（秒）
+    _CONNECT_TIMEOUT = 3.0
     
     def __init__(self, port='COM3', baudrate=115200):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.serial_conn = None
         self.running = False
-        self.read_thread = None
+        self.reader_process = None
+        self._data_queue = None
+        self._command_queue = None
+        self._stop_event = None
+        # 串口正在由子进程打开，结果在 _drain_queue 中处理
+        self._connect_pending = False
+        self._connect_deadline = 0.0
+        # 距离信号限流：界面按约30fps刷新，更密集的微小变化无需逐个发送
+        self._last_emitted_distance = None
+        self._last_emit_ts = 0.0
+        self._min_emit_interval = 1 / 30
+        self._distance_epsilon = 0.5
+
+        # 最近距离数据的环形缓冲区（float32连续存储），供统计计算直接做向量化运算
+        self._dist_ring = np.empty(1024, dtype=np.float32)
+        self._dist_idx = 0
+
+        # 模拟数据线程的停止事件，set()后线程立即从等待中醒来退出
+        self._mock_stop_event = threading.Event()
+
+        # 在Qt主线程中定时取出子进程的解析结果并发送信号
+        self._drain_timer = QTimer(self)
+        self._drain_timer.setInterval(5)
+        self._drain_timer.timeout.connect(self._drain_queue)
         
         # 模拟数据（用于测试）
         self.mock_mode = True
@@ -28,89 +248,141 @@ class SerialCommunication(QObject):
         self.mock_direction = "Right"
         
     def connect_device(self):
-        """连接串口"""
+        """
+        连接串口（异步）
+
+        只启动串口子进程并立即返回，不阻塞界面线程；
+        打开结果由 _drain_queue 收到后通过 connection_status_changed 通知，失败时切换到模拟模式
+
+        Returns:
+            bool: 子进程是否已启动
+        """
         try:
-            self.serial_conn = serial.Serial(
-                port=self.port,
-                baudrate=self.baudrate,
-                timeout=1
+            self._data_queue = _MP_CTX.Queue()
+            self._command_queue = _MP_CTX.Queue()
+            self._stop_event = _MP_CTX.Event()
+            self.reader_process = SerialReaderProcess(
+                self.port, self.baudrate,
+                self._data_queue, self._command_queue, self._stop_event
             )
-            self.running = True
-            self.read_thread = threading.Thread(target=self.read_data)
-            self.read_thread.daemon = True
-            self.read_thread.start()
-            
-            self.connection_status_changed.emit(True)
-            print(f"串口连接成功: {self.port}")
-            return True
-            
+            self.reader_process.start()
         except Exception as e:
-            print(f"串口连接失败: {e}")
-            self.mock_mode = True
-            self.start_mock_data()
+            self._connect_failed(e)
             return False
+
+        self._connect_pending = True
+        self._connect_deadline = time.monotonic() + self._CONNECT_TIMEOUT
+        self._drain_timer.start()
+        return True
+
+    def _connect_failed(self, detail):
+        """串口打开失败：停止子进程并切换到模拟数据模式"""
+        logger.warning("串口连接失败: %s", detail)
+        self._connect_pending = False
+        self._drain_timer.stop()
+        # 子进程可能仍卡在打开串口，直接终止，避免 join 等待
+        if self.reader_process is not None and self.reader_process.is_alive():
+            self.reader_process.terminate()
+        self._stop_reader()
+        self.mock_mode = True
+        self.start_mock_data()
     
     def disconnect(self):
         """断开串口连接"""
         self.running = False
-        if self.serial_conn:
-            self.serial_conn.close()
-        if self.read_thread:
-            self.read_thread.join()
+        self._connect_pending = False
+        self._mock_stop_event.set()
+        self._drain_timer.stop()
+        self._stop_reader()
         self.connection_status_changed.emit(False)
-    
-    def read_data(self):
-        """读取串口数据"""
-        while self.running:
+
+    def _stop_reader(self):
+        """停止串口读取子进程"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.reader_process is not None:
+            self.reader_process.join(timeout=1)
+            if self.reader_process.is_alive():
+                self.reader_process.terminate()
+            self.reader_process = None
+
+    def _drain_queue(self):
+        """取出子进程发来的全部解析结果并分发为信号"""
+        while True:
             try:
-                if self.serial_conn and self.serial_conn.in_waiting > 0:
-                    line = self.serial_conn.readline().decode('utf-8').strip()
-                    if line:
-                        self.parse_data(line)
-                time.sleep(0.01)  # 10ms延迟
-            except Exception as e:
-                print(f"读取串口数据错误: {e}")
+                kind, value = self._data_queue.get_nowait()
+            except queue.Empty:
                 break
+            self._dispatch(kind, value)
+
+        # 子进程在限定时间内未报告打开结果，视为失败
+        if self._connect_pending and time.monotonic() >= self._connect_deadline:
+            self._connect_failed("等待串口打开超时")
+
+    def _dispatch(self, kind, value):
+        """根据记录类型发送对应信号"""
+        if kind == "dir":
+            self.finger_direction_received.emit(value)
+        elif kind == "dist":
+            self._emit_distance(value)
+        elif kind == "connected":
+            self._connect_pending = False
+            self.running = True
+            self.connection_status_changed.emit(True)
+            logger.info("串口连接成功: %s", self.port)
+        elif kind == "error":
+            self._connect_failed(value)
+        elif kind == "disconnected":
+            logger.warning("串口连接断开: %s", value)
+            self.running = False
+            self._drain_timer.stop()
+            self._stop_reader()
+            self.connection_status_changed.emit(False)
+
+    def _emit_distance(self, distance):
+        """发送距离信号；距离变化很小且距上次发送不足一帧时间时跳过"""
+        # 每个采样都记录到环形缓冲区（包括被限流跳过的）
+        self._dist_ring[self._dist_idx % self._dist_ring.size] = distance
+        self._dist_idx += 1
+
+        now = time.monotonic()
+        last = self._last_emitted_distance
+        if (last is None or now - self._last_emit_ts >= self._min_emit_interval or
+                abs(distance - last) > self._distance_epsilon):
+            self._last_emitted_distance = distance
+            self._last_emit_ts = now
+            self.distance_received.emit(distance)
     
+    def recent_distances(self, n=None):
+        """
+        获取最近的距离采样（按时间顺序）
+
+        Args:
+            n: 采样个数，默认返回缓冲区内全部采样
+
+        Returns:
+            np.ndarray: float32数组
+        """
+        count = min(self._dist_idx, self._dist_ring.size)
+        if n is None or n > count:
+            n = count
+        indices = np.arange(self._dist_idx - n, self._dist_idx) % self._dist_ring.size
+        return self._dist_ring.take(indices)
+
     def parse_data(self, data):
         """解析接收到的数据"""
-        try:
-            # 假设数据格式为JSON: {"type": "direction", "value": "Right"}
-            parsed_data = json.loads(data)
-            
-            if parsed_data.get("type") == "direction":
-                direction = parsed_data.get("value")
-                if direction in ["Up", "Down", "Left", "Right"]:
-                    self.finger_direction_received.emit(direction)
-            
-            elif parsed_data.get("type") == "distance":
-                distance = float(parsed_data.get("value", 0))
-                if 0 < distance < 1000:  # 合理的距离范围
-                    self.distance_received.emit(distance)
-                    
-        except json.JSONDecodeError:
-            # 如果不是JSON格式，尝试简单解析
-            if data.startswith("DIR:"):
-                direction = data[4:].strip()
-                if direction in ["Up", "Down", "Left", "Right"]:
-                    self.finger_direction_received.emit(direction)
-            elif data.startswith("DIST:"):
-                try:
-                    distance = float(data[5:].strip())
-                    self.distance_received.emit(distance)
-                except ValueError:
-                    pass
-        except Exception as e:
-            print(f"解析数据错误: {e}")
+        record = _parse_line(data)
+        if record is not None:
+            self._dispatch(*record)
     
     def send_command(self, command):
-        """发送命令到下位机"""
-        if self.serial_conn:
+        """发送命令到下位机（由串口子进程写出）"""
+        if self.reader_process is not None and self.reader_process.is_alive():
             try:
-                self.serial_conn.write(f"{command}\n".encode('utf-8'))
+                self._command_queue.put(_encode_cmd(command))
                 return True
             except Exception as e:
-                print(f"发送命令失败: {e}")
+                logger.warning("发送命令失败: %s", e)
                 return False
         return False
     
@@ -121,29 +393,36 @@ class SerialCommunication(QObject):
             
         def mock_data_thread():
             import random
-            directions = ["Up", "Down", "Left", "Right"]
+            directions = _DIRECTIONS_TUPLE
+            # 线程独立的随机数生成器，方法提前绑定到局部变量
+            rng = random.Random()
+            uniform = rng.uniform
+            rand = rng.random
+            choice = rng.choice
+            stop_event = self._mock_stop_event
             
-            while self.running:
+            # 每100ms更新一次，停止事件触发时立即退出
+            while not stop_event.wait(0.1):
                 # 模拟距离变化
-                distance_change = random.uniform(-2, 2)
-                self.mock_distance = max(40, min(200, self.mock_distance + distance_change))
-                self.distance_received.emit(self.mock_distance)
+                distance_change = uniform(-2, 2)
+                distance = self.mock_distance + distance_change
+                self.mock_distance = distance if 40 <= distance <= 200 else (40 if distance < 40 else 200)
+                self._emit_distance(self.mock_distance)
                 
                 # 模拟方向变化（较少频率）
-                if random.random() < 0.1:  # 10%概率改变方向
-                    self.mock_direction = random.choice(directions)
+                if rand() < 0.1:  # 10%概率改变方向
+                    self.mock_direction = choice(directions)
                 
                 self.finger_direction_received.emit(self.mock_direction)
-                
-                time.sleep(0.1)  # 100ms更新一次
         
         self.running = True
+        self._mock_stop_event.clear()
         mock_thread = threading.Thread(target=mock_data_thread)
         mock_thread.daemon = True
         mock_thread.start()
         
         self.connection_status_changed.emit(True)
-        print("启动模拟数据模式")
+        logger.info("启动模拟数据模式")
 
 
 class MockCommunication(QObject):
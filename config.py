@@ -2,9 +2,21 @@
 配置文件
 管理API密钥和系统设置
 """
+import copy
 import json
 import os
-import cv2
+from contextlib import contextmanager
+import platform
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+# 优先使用orjson保存配置，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # 配置文件路径
 CONFIG_FILE = "user_config.json"
@@ -124,12 +136,38 @@ SYSTEM_CONFIG = {
 }
 
 # 用户配置（从文件加载，可动态修改）
+# 使用深拷贝，避免修改嵌套配置（如voice_recognition、resolution）时连带改动上面的默认值
 USER_CONFIG = {
-    "siliconflow": SILICONFLOW_CONFIG.copy(),
-    "camera": CAMERA_CONFIG.copy(),
-    "system": SYSTEM_CONFIG.copy()
+    "siliconflow": copy.deepcopy(SILICONFLOW_CONFIG),
+    "camera": copy.deepcopy(CAMERA_CONFIG),
+    "system": copy.deepcopy(SYSTEM_CONFIG)
 }
 
+# 配置读取缓存：getter返回只读视图，仅在配置变更后重建，避免每次调用都复制字典
+_config_version = 0
+_config_cache = {}
+
+def _invalidate_config_cache():
+    """配置发生变更时调用，使缓存的只读视图失效"""
+    global _config_version
+    _config_version += 1
+
+def _freeze(value):
+    """递归生成只读视图（dict转为MappingProxyType，list转为tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _cached_view(key, build):
+    """获取缓存的只读配置视图，配置版本变化时重新构建"""
+    entry = _config_cache.get(key)
+    if entry is None or entry[0] != _config_version:
+        entry = (_config_version, _freeze(build()))
+        _config_cache[key] = entry
+    return entry[1]
+
 def load_user_config():
     """从文件加载用户配置"""
     global USER_CONFIG
@@ -143,28 +181,72 @@ def load_user_config():
                 USER_CONFIG["system"].update(saved_config.get("system", {}))
     except Exception as e:
         print(f"加载配置文件失败: {e}")
+    finally:
+        _invalidate_config_cache()
 
 def save_user_config():
-    """保存用户配置到文件"""
+    """保存用户配置到文件（先写临时文件再替换，避免写入中断导致配置损坏）"""
+    global _config_dirty
+    tmp_file = CONFIG_FILE + ".tmp"
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(USER_CONFIG, f, ensure_ascii=False, indent=2)
+        if ORJSON_AVAILABLE:
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(USER_CONFIG, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(USER_CONFIG, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, CONFIG_FILE)
+        _config_dirty = False
         return True
     except Exception as e:
         print(f"保存配置文件失败: {e}")
         return False
 
+# 批量更新：config_batch()内的多次update_*只在退出时写一次文件
+_config_dirty = False
+_batch_depth = 0
+
+def _mark_config_dirty():
+    """标记配置已修改，并使缓存的只读视图失效"""
+    global _config_dirty
+    _config_dirty = True
+    _invalidate_config_cache()
+
+def _maybe_save():
+    """不在批量更新中且配置有修改时保存"""
+    if _batch_depth > 0 or not _config_dirty:
+        return True
+    return save_user_config()
+
+@contextmanager
+def config_batch():
+    """
+    批量更新配置，退出时统一保存一次
+
+    用法:
+        with config_batch():
+            update_camera_config(fps=30)
+            update_system_config({...})
+    """
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        _maybe_save()
+
 def get_siliconflow_config():
-    """获取SiliconFlow配置"""
-    return USER_CONFIG["siliconflow"].copy()
+    """获取SiliconFlow配置（只读视图，修改请使用update_siliconflow_config）"""
+    return _cached_view("siliconflow", lambda: USER_CONFIG["siliconflow"])
 
 def get_camera_config():
-    """获取摄像头配置"""
-    return USER_CONFIG["camera"].copy()
+    """获取摄像头配置（只读视图，修改请使用update_camera_config）"""
+    return _cached_view("camera", lambda: USER_CONFIG["camera"])
 
 def get_system_config():
-    """获取系统配置"""
-    return USER_CONFIG["system"].copy()
+    """获取系统配置（只读视图，修改请使用update_system_config）"""
+    return _cached_view("system", lambda: USER_CONFIG["system"])
 
 def update_siliconflow_config(api_key=None, model=None, timeout=None, max_tokens=None):
     """更新SiliconFlow配置"""
@@ -176,7 +258,8 @@ def update_siliconflow_config(api_key=None, model=None, timeout=None, max_tokens
         USER_CONFIG["siliconflow"]["timeout"] = timeout
     if max_tokens is not None:
         USER_CONFIG["siliconflow"]["max_tokens"] = max_tokens
-    return save_user_config()
+    _mark_config_dirty()
+    return _maybe_save()
 
 def update_camera_config(camera_index=None, resolution=None, fps=None, exposure=None, brightness=None, contrast=None):
     """更新摄像头配置"""
@@ -192,12 +275,14 @@ def update_camera_config(camera_index=None, resolution=None, fps=None, exposure=
         USER_CONFIG["camera"]["brightness"] = brightness
     if contrast is not None:
         USER_CONFIG["camera"]["contrast"] = contrast
-    return save_user_config()
+    _mark_config_dirty()
+    return _maybe_save()
 
 def update_system_config(new_config):
     """更新系统配置"""
     USER_CONFIG["system"].update(new_config)
-    return save_user_config()
+    _mark_config_dirty()
+    return _maybe_save()
 
 def update_volcengine_config(app_id=None, access_token=None, secret_key=None):
     """更新火山引擎语音识别配置"""
@@ -213,22 +298,24 @@ def update_volcengine_config(app_id=None, access_token=None, secret_key=None):
         voice_config["volcengine"]["secret_key"] = secret_key
 
     USER_CONFIG["system"]["voice_recognition"] = voice_config
-    return save_user_config()
+    _mark_config_dirty()
+    return _maybe_save()
 
 def get_volcengine_config():
-    """获取火山引擎配置"""
-    voice_config = get_voice_config()
-    return voice_config.get("volcengine", {})
+    """获取火山引擎配置（只读视图，直接缓存，无需每次逐层查找）"""
+    return _cached_view("volcengine", lambda: _build_voice_config().get("volcengine", {}))
 
 def is_volcengine_configured():
     """检查火山引擎是否配置完整"""
-    config = get_volcengine_config()
-    return (bool(config.get("app_id")) and
-            bool(config.get("access_token")) and
-            bool(config.get("secret_key")))
+    get = get_volcengine_config().get
+    return bool(get("app_id")) and bool(get("access_token")) and bool(get("secret_key"))
 
 def get_voice_config():
-    """获取语音识别配置 - 火山引擎"""
+    """获取语音识别配置 - 火山引擎（只读视图）"""
+    return _cached_view("voice", _build_voice_config)
+
+def _build_voice_config():
+    """构建语音识别配置，缺失时使用默认值"""
     return USER_CONFIG["system"].get("voice_recognition", {
         "enabled": True,
         "mode": "volcengine",      # 使用火山引擎
@@ -266,34 +353,54 @@ def get_available_models():
     """获取可用的模型列表"""
     return USER_CONFIG["siliconflow"]["models"]
 
+def _camera_backend():
+    """选择摄像头后端，避免OpenCV逐个尝试所有后端"""
+    # OpenCV体积较大，只在检测摄像头时才导入，避免拖慢启动
+    import cv2
+    system = platform.system()
+    if system == "Windows":
+        return cv2.CAP_DSHOW
+    if system == "Linux":
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+def _probe_camera(index, backend):
+    """探测单个摄像头索引，不可用时返回None"""
+    import cv2
+    try:
+        cap = cv2.VideoCapture(index, backend)
+        try:
+            if not cap.isOpened():
+                return None
+            # 通过属性查询确认摄像头可用，无需真正读取一帧（读帧需等待曝光稳定）
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            if width <= 0:
+                return None
+            # 获取摄像头信息
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = int(cap.get(cv2.CAP_PROP_FPS))
+        finally:
+            cap.release()
+    except Exception:
+        return None
+
+    return {
+        "index": index,
+        "name": f"摄像头 {index}",
+        "resolution": f"{width}x{height}",
+        "fps": fps if fps > 0 else "未知"
+    }
+
 def detect_available_cameras():
-    """检测可用的摄像头设备"""
-    available_cameras = []
+    """检测可用的摄像头设备（并行探测，打开摄像头时OpenCV会释放GIL）"""
+    backend = _camera_backend()
 
     # 检测最多10个摄像头索引
-    for i in range(10):
-        try:
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                # 尝试读取一帧来确认摄像头可用
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    # 获取摄像头信息
-                    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    fps = int(cap.get(cv2.CAP_PROP_FPS))
-
-                    available_cameras.append({
-                        "index": i,
-                        "name": f"摄像头 {i}",
-                        "resolution": f"{width}x{height}",
-                        "fps": fps if fps > 0 else "未知"
-                    })
-                cap.release()
-        except Exception:
-            continue
-
-    return available_cameras
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = executor.map(lambda i: _probe_camera(i, backend), range(10))
+
+    # executor.map按索引顺序返回结果
+    return [camera for camera in results if camera is not None]
 
 def get_api_setup_instructions():
     """获取API设置说明"""
@@ -4,13 +4,14 @@
 import sys
 import numpy
 import os
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt
 
 # 添加当前目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from main_with_ui import VisionMainWindow
+from main_with_ui import VisionMainWindow, configure_logging
 
 def main():
     """主函数"""
@@ -32,4 +33,7 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    # 串口读取使用子进程，Windows打包运行时需要freeze_support
+    multiprocessing.freeze_support()
+    configure_logging()
     main()
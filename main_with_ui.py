@@ -5,9 +5,10 @@
 """
 import sys
 import os
-import traceback
+import logging
 import random
 import time
+import functools
 
 # 设置环境变量，解决SystemError
 os.environ['PY_SSIZE_T_CLEAN'] = '1'
@@ -16,20 +17,51 @@ os.environ['PY_SSIZE_T_CLEAN'] = '1'
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from PySide6.QtWidgets import QApplication, QMainWindow, QLabel
-from PySide6.QtCore import Qt, QTimer, QThread, Signal
-from PySide6.QtGui import QFont, QPainter, QPen, QBrush, QIcon
+from PySide6.QtCore import (Qt, QTimer, QThread, Signal, QSignalBlocker, QEvent, QSize, Property,
+                            QPropertyAnimation, QAbstractAnimation)
+from PySide6.QtGui import (QFont, QPainter, QPen, QBrush, QIcon, QPixmap, QTextCursor,
+                           QPalette, QColor)
 
 from ui_generated import Ui_MainWindow
 from camera_with_gesture import CameraWithGestureHandler
 from vision_calculator import VisionCalculator
 from communication import MockCommunication
 from ai_diagnosis import AIVisionDiagnosis
-from config import (get_siliconflow_config, get_camera_config, get_voice_config,
-                   is_api_key_configured, get_api_setup_instructions, is_volcengine_configured)
+from config import (get_siliconflow_config, get_camera_config, get_voice_config, get_system_config,
+                   is_api_key_configured, get_api_setup_instructions, is_volcengine_configured,
+                   get_volcengine_config)
 from settings_dialog import SettingsDialog
-from resources_manager import resource_manager
+from resources_manager import get_resource_manager
 from voice_controller import VoiceController
 
+logger = logging.getLogger(__name__)
+
+# 控制按钮尺寸（窗口模式 / 全屏模式），预先构造以便复用
+_SZ_100x40 = QSize(100, 40)
+_SZ_120x40 = QSize(120, 40)
+_SZ_110x45 = QSize(110, 45)
+_SZ_120x45 = QSize(120, 45)
+_SZ_130x45 = QSize(130, 45)
+
+# 语音方向命令到系统方向的映射
+_VOICE_DIRECTIONS = {"up": "Up", "down": "Down", "left": "Left", "right": "Right"}
+
+# 高频语音反馈消息模板
+_FMT_VOICE_DIR = "🎤 语音方向: %s → %s"
+_FMT_DIR_IDLE = "✅ 方向识别成功: %s (当前未在测试模式)"
+
+
+@functools.lru_cache(maxsize=1)
+def _volcengine_status():
+    """火山引擎配置状态 (是否已配置, app_id)，设置保存后由 reload_configurations 清除"""
+    return is_volcengine_configured(), get_volcengine_config().get("app_id", "")
+
+
+@functools.lru_cache(maxsize=128)
+def _format_msg(template, *args):
+    """格式化反馈消息；参数组合有限，结果直接复用"""
+    return template % args
+
 class AIDiagnosisThread(QThread):
     """AI诊断线程"""
 
@@ -41,12 +73,19 @@ class AIDiagnosisThread(QThread):
     diagnosis_completed = Signal(str)  # 诊断完成
     diagnosis_failed = Signal(str)     # 诊断失败
 
+    # 流式内容跨线程发送的最小间隔（秒）
+    _STREAM_EMIT_INTERVAL = 0.03
+
     def __init__(self, ai_diagnosis, test_results):
         super().__init__()
         self.ai_diagnosis = ai_diagnosis
         self.test_results = test_results
         self.is_running = True
 
+        # 流式内容缓冲：在工作线程内合并，至多每30ms跨线程发送一次
+        self._buf = []
+        self._last_emit = 0.0
+
         # 设置流式回调
         if self.ai_diagnosis:
             self.ai_diagnosis.stream_callback = self.handle_stream_callback
@@ -55,12 +94,28 @@ class AIDiagnosisThread(QThread):
     def handle_stream_callback(self, content, is_start=False, is_chunk=False, is_end=False):
         """处理流式回调"""
         if is_start:
+            self._buf.clear()
+            self._last_emit = time.monotonic()
             self.stream_started.emit()
         elif is_chunk:
-            self.stream_content.emit(content)
+            # 收到中断请求时抛出异常，让流式读取循环尽快结束
+            if self.isInterruptionRequested():
+                raise InterruptedError("AI诊断已取消")
+            self._buf.append(content)
+            now = time.monotonic()
+            if now - self._last_emit >= self._STREAM_EMIT_INTERVAL:
+                self._flush_stream()
+                self._last_emit = now
         elif is_end:
+            self._flush_stream()
             self.stream_ended.emit()
 
+    def _flush_stream(self):
+        """发送缓冲中的流式内容"""
+        if self._buf:
+            self.stream_content.emit("".join(self._buf))
+            self._buf.clear()
+
     def handle_progress_callback(self, message):
         """处理进度回调"""
         self.progress_updated.emit(message)
@@ -68,10 +123,10 @@ class AIDiagnosisThread(QThread):
     def run(self):
         """运行AI诊断"""
         try:
-            if not self.is_running:
+            if not self.is_running or self.isInterruptionRequested():
                 return
 
-            # 执行AI诊断
+            # 执行AI诊断（相同输入的结果由诊断模块自身的缓存复用）
             diagnosis = self.ai_diagnosis.analyze_vision_results(self.test_results)
 
             if self.is_running:
@@ -81,99 +136,212 @@ class AIDiagnosisThread(QThread):
             if self.is_running:
                 self.diagnosis_failed.emit(str(e))
 
-    def stop(self):
-        """停止线程"""
+    def stop(self, wait=True):
+        """停止线程；wait=False 时只发出中断请求，不阻塞调用方"""
         self.is_running = False
+        self.requestInterruption()
+        # 中止阻塞中的HTTP请求，线程无需等到超时才退出
+        if self.ai_diagnosis:
+            self.ai_diagnosis.cancel()
         self.quit()
-        self.wait()
+        if wait:
+            self.wait()
+
+@functools.lru_cache(maxsize=64)
+def _e_rects(width, height, direction, stroke_width, gap_width):
+    """计算E字母四个笔画的矩形 (x, y, w, h)，坐标相对于字母左上角"""
+    if direction == "Right":
+        # 开口向右的E
+        return (
+            (0, 0, width - gap_width, stroke_width),
+            (0, height//2 - stroke_width//2, width - gap_width, stroke_width),
+            (0, height - stroke_width, width - gap_width, stroke_width),
+            (0, 0, stroke_width, height),
+        )
+    if direction == "Left":
+        # 开口向左的E
+        return (
+            (gap_width, 0, width - gap_width, stroke_width),
+            (gap_width, height//2 - stroke_width//2, width - gap_width, stroke_width),
+            (gap_width, height - stroke_width, width - gap_width, stroke_width),
+            (width - stroke_width, 0, stroke_width, height),
+        )
+    if direction == "Up":
+        # 开口向上的E（旋转90度）
+        return (
+            (0, gap_width, stroke_width, height - gap_width),
+            (width//2 - stroke_width//2, gap_width, stroke_width, height - gap_width),
+            (width - stroke_width, gap_width, stroke_width, height - gap_width),
+            (0, height - stroke_width, width, stroke_width),
+        )
+    if direction == "Down":
+        # 开口向下的E（旋转90度）
+        return (
+            (0, 0, stroke_width, height - gap_width),
+            (width//2 - stroke_width//2, 0, stroke_width, height - gap_width),
+            (width - stroke_width, 0, stroke_width, height - gap_width),
+            (0, 0, width, stroke_width),
+        )
+    return ()
 
 class ELetterWidget(QLabel):
-    """E字母显示控件"""
+    """E字母显示控件：四个方向的E字母预先渲染成QPixmap，切换方向时只替换pixmap"""
+
+    _DIRECTIONS = ("Up", "Down", "Left", "Right")
+
+    # 可用的背景颜色名称
+    _BG_COLORS = {
+        "white": QColor(Qt.GlobalColor.white),
+        "green": QColor(Qt.GlobalColor.green),
+        "red": QColor(Qt.GlobalColor.red),
+    }
     
     def __init__(self):
         super().__init__()
         self.letter_size = 100
         self.direction = "Right"  # Up, Down, Left, Right
         self.background_color = "white"
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # 预渲染的四个方向E字母，_dir_pixmaps_size 为其实际边长
+        self._dir_pixmaps = {}
+        self._dir_pixmaps_size = 0
+        # 复用的画刷与画笔，避免每次绘制重新构造
+        self._brush_black = QBrush(Qt.GlobalColor.black)
+        self._pen_black = QPen(Qt.GlobalColor.black, 2)
+        # 背景色通过调色板填充，颜色由 backgroundColor 属性驱动（可被动画插值）
+        self._bg_palette = QPalette(self.palette())
+        self._bg_color = QColor(self._BG_COLORS["white"])
+        self._bg_palette.setColor(QPalette.ColorRole.Window, self._bg_color)
+        self.setAutoFillBackground(True)
+        self.setPalette(self._bg_palette)
         
     def set_letter_params(self, size, direction):
         """设置字母参数"""
         self.letter_size = size
         self.direction = direction
-        self.update()
+        self._refresh_pixmap()
     
+    def _get_background_color(self):
+        return self._bg_color
+
+    def _set_background_color(self, color):
+        if color == self._bg_color:
+            return
+        self._bg_color = QColor(color)
+        self._bg_palette.setColor(QPalette.ColorRole.Window, self._bg_color)
+        self.setPalette(self._bg_palette)
+
+    # 背景颜色属性，供 QPropertyAnimation 使用
+    backgroundColor = Property(QColor, _get_background_color, _set_background_color)
+
     def set_background_color(self, color):
         """设置背景颜色"""
         self.background_color = color
-        self.update()
+        self._set_background_color(self._BG_COLORS.get(color, self._BG_COLORS["white"]))
     
-    def paintEvent(self, event):
-        """绘制E字母"""
-        painter = QPainter(self)
+    def resizeEvent(self, event):
+        """控件尺寸变化时E字母可用边长可能改变"""
+        super().resizeEvent(event)
+        self._refresh_pixmap()
+    
+    def _refresh_pixmap(self):
+        """显示当前方向的E字母，边长变化时才重新渲染四个方向"""
+        # E字母的实际大小，保持正方形并留出边距
+        e_width = min(self.letter_size, self.width() - 20)
+        if e_width <= 0:
+            self.clear()
+            return
+        if e_width != self._dir_pixmaps_size:
+            self._dir_pixmaps = {d: self._render_e(d, e_width) for d in self._DIRECTIONS}
+            self._dir_pixmaps_size = e_width
+        pix = self._dir_pixmaps.get(self.direction)
+        if pix is not None:
+            self.setPixmap(pix)
+    
+    def _render_e(self, direction, size):
+        """将指定方向的E字母渲染到透明QPixmap中"""
+        pix = QPixmap(size, size)
+        pix.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pix)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # 设置背景
-        if self.background_color == "green":
-            painter.fillRect(self.rect(), QBrush(Qt.GlobalColor.green))
-        elif self.background_color == "red":
-            painter.fillRect(self.rect(), QBrush(Qt.GlobalColor.red))
-        else:
-            painter.fillRect(self.rect(), QBrush(Qt.GlobalColor.white))
-        
-        # 计算E字母的绘制区域
-        widget_width = self.width()
-        widget_height = self.height()
-        
-        # E字母的实际大小
-        e_width = min(self.letter_size, widget_width - 20)
-        e_height = e_width  # 保持正方形
-        
-        # 居中位置
-        start_x = (widget_width - e_width) // 2
-        start_y = (widget_height - e_height) // 2
-        
-        # 设置画笔
-        painter.setPen(QPen(Qt.GlobalColor.black, 2))
-        painter.setBrush(QBrush(Qt.GlobalColor.black))
-        
-        # 根据方向绘制E字母
-        self.draw_e_letter(painter, start_x, start_y, e_width, e_height)
+        painter.setPen(self._pen_black)
+        painter.setBrush(self._brush_black)
+        self.draw_e_letter(painter, 0, 0, size, size, direction)
+        painter.end()
+        return pix
     
-    def draw_e_letter(self, painter, x, y, width, height):
+    def draw_e_letter(self, painter, x, y, width, height, direction=None):
         """绘制E字母"""
         stroke_width = max(width // 10, 2)  # 笔画宽度
         gap_width = width // 5  # 开口宽度
         
-        if self.direction == "Right":
-            # 开口向右的E
-            painter.fillRect(x, y, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x, y + height//2 - stroke_width//2, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x, y + height - stroke_width, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x, y, stroke_width, height, Qt.GlobalColor.black)
-            
-        elif self.direction == "Left":
-            # 开口向左的E
-            painter.fillRect(x + gap_width, y, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x + gap_width, y + height//2 - stroke_width//2, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x + gap_width, y + height - stroke_width, width - gap_width, stroke_width, Qt.GlobalColor.black)
-            painter.fillRect(x + width - stroke_width, y, stroke_width, height, Qt.GlobalColor.black)
-            
-        elif self.direction == "Up":
-            # 开口向上的E（旋转90度）
-            painter.fillRect(x, y + gap_width, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x + width//2 - stroke_width//2, y + gap_width, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x + width - stroke_width, y + gap_width, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x, y + height - stroke_width, width, stroke_width, Qt.GlobalColor.black)
-            
-        elif self.direction == "Down":
-            # 开口向下的E（旋转90度）
-            painter.fillRect(x, y, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x + width//2 - stroke_width//2, y, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x + width - stroke_width, y, stroke_width, height - gap_width, Qt.GlobalColor.black)
-            painter.fillRect(x, y, width, stroke_width, Qt.GlobalColor.black)
+        black = self._brush_black
+        rects = _e_rects(width, height, direction or self.direction, stroke_width, gap_width)
+        for rx, ry, rw, rh in rects:
+            painter.fillRect(x + rx, y + ry, rw, rh, black)
 
 class VisionMainWindow(QMainWindow):
     """视力系统主窗口 - 使用UI文件"""
+
+    # 控制栏中spacer的位置，首次添加按钮时确定
+    _controls_spacer_idx = None
+
+    # 测试时随机选择的E字母方向
+    _TEST_DIRECTIONS = ("Up", "Down", "Left", "Right")
+
+    # 上次应用的布局参数 (is_fullscreen, frame_size, result_height, button_height)
+    _last_layout = None
+
+    # 方向标签样式（预先生成，避免每次事件格式化字符串）
+    _DIR_STYLES = {
+        "Up": "font-size: 16px; font-weight: bold; color: blue;",
+        "Down": "font-size: 16px; font-weight: bold; color: orange;",
+        "Left": "font-size: 16px; font-weight: bold; color: purple;",
+        "Right": "font-size: 16px; font-weight: bold; color: green;",
+        "None": "font-size: 16px; font-weight: bold; color: red;",
+    }
+    _DIR_STYLE_DEFAULT = _DIR_STYLES["None"]
+
+    # 语音命令反馈类型对应的图标
+    _FEEDBACK_ICONS = {
+        "direction": "🎯",
+        "control": "🎮",
+        "system": "⚙️",
+        "warning": "⚠️",
+        "error": "❌"
+    }
+
+    # 语音控制按钮样式
+    _VOICE_ON_QSS = "background-color: #4CAF50; color: white;"
+    _VOICE_OFF_QSS = "background-color: #6c757d; color: white;"
+    _VOICE_FAIL_QSS = "background-color: #f44336; color: white;"
+
+    # 结果区最多保留的段落数
+    _RESULTS_MAX_BLOCKS = 5000
+
+    # 安全退出时等待AI诊断线程结束的最长时间（秒）
+    _EXIT_THREAD_TIMEOUT = 1.0
+
+    # 关闭窗口时等待AI诊断线程结束的最长时间（毫秒），超时后强制终止
+    _CLOSE_THREAD_TIMEOUT_MS = 3000
+
+    # 全屏模式下的退出按钮样式
+    _EXIT_BTN_QSS_FULL = """
+        QPushButton#btn_exit {
+            background-color: #dc3545;
+            color: white;
+            border: 3px solid #dc3545;
+            border-radius: 10px;
+            font-weight: bold;
+            font-size: 16px;
+            padding: 8px 16px;
+            margin: 2px;
+        }
+        QPushButton#btn_exit:hover {
+            background-color: #c82333;
+            border-color: #c82333;
+        }
+    """
     
     def __init__(self):
         super().__init__()
@@ -182,16 +350,70 @@ class VisionMainWindow(QMainWindow):
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
+        # 摄像头和通信模块（先全部置为None，后续一律用 is None 判断，无需 hasattr）
+        self.camera_handler = None
+        self.communication = None
+        self.ai_diagnosis = None
+        self.ai_diagnosis_thread = None
+
+        # 语音控制器
+        self.voice_controller = None
+        self._voice_connected = False
+        # 最后一条语音反馈所在段落：锚定在段首的光标及写入时的段落文本
+        self._last_voice_feedback_cursor = None
+        self._last_voice_feedback_text = None
+        self._display_frame = None  # 当前显示的摄像头帧
+        self._settings_dialog = None  # 设置对话框，首次打开时构造
+        self._close_pending = False  # 关闭窗口正在等待AI诊断线程结束
+        self._devices_released = False  # 摄像头、语音与通信是否已释放
+        self._results_scrollbar = self.ui.textEdit_results.verticalScrollBar()
+
+        # 结果区共用一个插入光标；文档段落数有上限，长时间运行时排版开销保持稳定
+        results_doc = self.ui.textEdit_results.document()
+        results_doc.setMaximumBlockCount(self._RESULTS_MAX_BLOCKS)
+        self._results_cursor = QTextCursor(results_doc)
+
+        # 摄像头画面的目标尺寸，仅在标签尺寸变化时更新（见 eventFilter）
+        self._camera_label_size = QSize(self.ui.label_camera.size())
+        self.ui.label_camera.installEventFilter(self)
+
         # 添加缺失的按钮
         self.add_missing_buttons()
 
         # 设置窗口显示模式
         self.is_fullscreen = False
 
+        # 摄像头是否已成功启动（由 start_camera_and_gesture / stop_camera 维护）
+        self._camera_running = False
+
+        # 配置快照，仅在 reload_configurations 中刷新
+        self._sys_cfg = get_system_config()
+        self._voice_cfg = get_voice_config()
+
         # 检查是否启用自动全屏模式
-        from config import get_system_config
-        system_config = get_system_config()
-        auto_fullscreen = system_config.get("auto_fullscreen", False)
+        auto_fullscreen = self._sys_cfg.get("auto_fullscreen", False)
+
+        # 窗口大小变化防抖定时器（需在 show* 之前创建，show 会触发 resizeEvent）
+        self._adaptive_layout = self._sys_cfg.get("adaptive_layout", True)
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.adjust_layout_for_display_mode)
+
+        # 测试定时器（同样在 show* 之前创建，changeEvent 会用到）
+        self.test_timer = QTimer(self)
+        self.test_timer.timeout.connect(self.check_test_progress)
+        self._test_timer_paused = False
+        self._minimized_at = 0.0  # 最小化开始的时间，恢复时据此顺延测试计时
+
+        # 背景闪烁动画，E字母控件创建后再构造
+        self._flash_anim = None
+
+        # AI流式内容在界面线程按约30FPS合并刷新
+        self._stream_pending = []
+        self._stream_flush_timer = QTimer(self)
+        self._stream_flush_timer.setSingleShot(True)
+        self._stream_flush_timer.setInterval(33)
+        self._stream_flush_timer.timeout.connect(self._flush_ai_stream)
 
         if auto_fullscreen:
             # 直接进入全屏模式
@@ -212,7 +434,7 @@ class VisionMainWindow(QMainWindow):
             self.exit_shortcut = QShortcut(QKeySequence("Ctrl+Q"), self)
             self.exit_shortcut.activated.connect(self.safe_exit)
         except ImportError:
-            print("警告: 无法导入快捷键模块，快捷键功能不可用")
+            logger.warning("无法导入快捷键模块，快捷键功能不可用")
 
         # 应用医疗主题样式
         self.apply_medical_theme()
@@ -235,15 +457,7 @@ class VisionMainWindow(QMainWindow):
             # 初始化组件
             self.vision_calculator = VisionCalculator()
 
-            # 摄像头和通信模块
-            self.camera_handler = None
-            self.communication = None
-            self.ai_diagnosis = None
-            self.ai_diagnosis_thread = None
-
             # 语音控制器
-            self.voice_controller = None
-            self._last_voice_feedback_message = None  # 记录最后一条语音反馈消息
             self._init_voice_controller()
 
             # 替换E字母显示区域
@@ -251,6 +465,11 @@ class VisionMainWindow(QMainWindow):
             self.ui.verticalLayout_e_letter.removeWidget(self.ui.label_e_letter)
             self.ui.label_e_letter.deleteLater()
             self.ui.verticalLayout_e_letter.addWidget(self.e_letter_widget)
+
+            # 闪烁动画对象只构造一次，每次闪烁只更新起始颜色后重新启动
+            self._flash_anim = QPropertyAnimation(self.e_letter_widget, b"backgroundColor", self)
+            self._flash_anim.setDuration(500)
+            self._flash_anim.setEndValue(ELetterWidget._BG_COLORS["white"])
             
             # 系统状态
             self.current_distance = 100.0
@@ -263,81 +482,105 @@ class VisionMainWindow(QMainWindow):
             self.is_testing = False
             self.test_start_time = 0
             self.correct_start_time = 0
+            # 成功/超时的截止时刻（time.monotonic）
+            self._success_deadline = 0.0
+            self._timeout_deadline = 0.0
 
-            # 定时器
-            self.test_timer = QTimer()
-            self.test_timer.timeout.connect(self.check_test_progress)
-
-            self.flash_timer = QTimer()
-            self.flash_timer.timeout.connect(self.reset_background)
-            
             # 连接信号
             self.setup_connections()
 
             # 添加初始信息
-            self.ui.textEdit_results.append("=== 电子视力表系统 ===")
+            lines = ["=== 电子视力表系统 ==="]
             if self.is_fullscreen:
-                self.ui.textEdit_results.append("🖥️ 程序已自动进入全屏模式")
-                self.ui.textEdit_results.append("💡 按 F11 可切换到窗口模式")
+                lines += ["🖥️ 程序已自动进入全屏模式", "💡 按 F11 可切换到窗口模式"]
             else:
-                self.ui.textEdit_results.append("🖥️ 窗口已自动最大化显示")
-                self.ui.textEdit_results.append("💡 按 F11 可切换到全屏模式")
-            self.ui.textEdit_results.append("🎯 程序框图将自动覆盖满整个屏幕")
-            self.ui.textEdit_results.append("🚪 点击右上角'❌ 退出'按钮或按 Ctrl+Q 可退出程序")
-            self.ui.textEdit_results.append("点击'启动摄像头'按钮开始手势识别")
+                lines += ["🖥️ 窗口已自动最大化显示", "💡 按 F11 可切换到全屏模式"]
+            lines += [
+                "🎯 程序框图将自动覆盖满整个屏幕",
+                "🚪 点击右上角'❌ 退出'按钮或按 Ctrl+Q 可退出程序",
+                "点击'启动摄像头'按钮开始手势识别",
+            ]
+            self._log_lines(lines)
 
-        except Exception as e:
-            print(f"系统初始化失败: {e}")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("系统初始化失败")
 
     def add_missing_buttons(self):
         """添加UI文件中缺失的按钮"""
+        if self._controls_spacer_idx is not None:
+            return  # 按钮已添加过
+
         try:
-            from PySide6.QtWidgets import QPushButton, QSizePolicy
-            from PySide6.QtCore import QSize
+            from PySide6.QtWidgets import QPushButton
+
+            layout = self.ui.horizontalLayout_controls
+            # ui_generated 中控制栏最后一项即spacer，插入按钮前先记下它
+            last_item = layout.itemAt(layout.count() - 1)
+            self.ui._controls_spacer = last_item if last_item and last_item.spacerItem() else None
 
             # 在控制按钮布局中添加缺失的按钮
 
             # 开始测试按钮
             self.ui.btn_start_test = QPushButton("开始测试")
-            self.ui.btn_start_test.setMinimumSize(QSize(100, 40))
+            self.ui.btn_start_test.setMinimumSize(_SZ_100x40)
             self.ui.btn_start_test.setEnabled(False)  # 初始禁用
             self.ui.horizontalLayout_controls.insertWidget(1, self.ui.btn_start_test)
 
             # 停止测试按钮
             self.ui.btn_stop_test = QPushButton("停止测试")
-            self.ui.btn_stop_test.setMinimumSize(QSize(100, 40))
+            self.ui.btn_stop_test.setMinimumSize(_SZ_100x40)
             self.ui.btn_stop_test.setEnabled(False)  # 初始禁用
             self.ui.horizontalLayout_controls.insertWidget(2, self.ui.btn_stop_test)
 
             # 语音控制按钮
             self.ui.btn_voice_toggle = QPushButton("🎤 语音控制")
-            self.ui.btn_voice_toggle.setMinimumSize(QSize(120, 40))
+            self.ui.btn_voice_toggle.setMinimumSize(_SZ_120x40)
             self.ui.btn_voice_toggle.setCheckable(True)
             self.ui.btn_voice_toggle.setChecked(False)
             self.ui.horizontalLayout_controls.insertWidget(3, self.ui.btn_voice_toggle)
 
             # 退出按钮
             self.ui.btn_exit = QPushButton("❌ 退出")
-            self.ui.btn_exit.setMinimumSize(QSize(100, 40))
+            self.ui.btn_exit.setMinimumSize(_SZ_100x40)
             # 在spacer之后添加退出按钮
-            spacer_index = -1
-            for i in range(self.ui.horizontalLayout_controls.count()):
-                item = self.ui.horizontalLayout_controls.itemAt(i)
-                if item.spacerItem():
-                    spacer_index = i
-                    break
+            spacer = self.ui._controls_spacer
+            spacer_index = layout.indexOf(spacer) if spacer is not None else -1
+            self._controls_spacer_idx = spacer_index
 
             if spacer_index >= 0:
-                self.ui.horizontalLayout_controls.insertWidget(spacer_index + 1, self.ui.btn_exit)
+                layout.insertWidget(spacer_index + 1, self.ui.btn_exit)
             else:
-                self.ui.horizontalLayout_controls.addWidget(self.ui.btn_exit)
-
-            print("✅ 缺失的按钮已添加")
-
-        except Exception as e:
-            print(f"添加缺失按钮失败: {e}")
-            traceback.print_exc()
+                layout.addWidget(self.ui.btn_exit)
+
+            logger.debug("缺失的按钮已添加")
+
+        except Exception:
+            logger.exception("添加缺失按钮失败")
+
+    def _scroll_results_to_bottom(self):
+        """结果区滚动到底部"""
+        bar = self._results_scrollbar
+        bar.setValue(bar.maximum())
+
+    def _append_line(self, text):
+        """向结果区末尾追加一段文本（代替 QTextEdit.append，复用同一个光标）"""
+        self._log_lines((text,))
+
+    def _log_lines(self, lines):
+        """一次性向结果区追加多行文本，整段只触发一次重新排版"""
+        bar = self._results_scrollbar
+        at_bottom = bar.value() >= bar.maximum()
+        cursor = self._results_cursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        # 与 append() 一致：非空文档先另起一段
+        if not self.ui.textEdit_results.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertText("\n".join(lines))
+        cursor.endEditBlock()
+        # 与 append() 一致：原本位于底部时保持跟随
+        if at_bottom:
+            bar.setValue(bar.maximum())
 
     def toggle_fullscreen(self):
         """切换全屏模式（F11快捷键）"""
@@ -346,21 +589,25 @@ class VisionMainWindow(QMainWindow):
                 # 退出全屏，回到最大化窗口
                 self.showMaximized()
                 self.is_fullscreen = False
-                self.ui.textEdit_results.append("🖥️ 已切换到最大化窗口模式（按F11可切换到全屏）")
-                self.ui.textEdit_results.append("📐 程序框图已调整为窗口模式显示")
+                self._log_lines([
+                    "🖥️ 已切换到最大化窗口模式（按F11可切换到全屏）",
+                    "📐 程序框图已调整为窗口模式显示",
+                ])
             else:
                 # 进入全屏模式
                 self.showFullScreen()
                 self.is_fullscreen = True
-                self.ui.textEdit_results.append("🖥️ 已切换到全屏模式（按F11可退出全屏）")
-                self.ui.textEdit_results.append("📐 程序框图已自动覆盖满整个屏幕")
+                self._log_lines([
+                    "🖥️ 已切换到全屏模式（按F11可退出全屏）",
+                    "📐 程序框图已自动覆盖满整个屏幕",
+                ])
 
             # 触发界面重新布局以适应新的显示模式
             self.adjust_layout_for_display_mode()
 
         except Exception as e:
-            print(f"切换全屏模式失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 切换显示模式失败: {str(e)}")
+            logger.exception("切换全屏模式失败")
+            self._append_line(f"❌ 切换显示模式失败: {str(e)}")
 
     def adjust_layout_for_display_mode(self):
         """根据显示模式调整界面布局"""
@@ -371,7 +618,7 @@ class VisionMainWindow(QMainWindow):
             screen_width = screen_geometry.width()
             screen_height = screen_geometry.height()
 
-            print(f"🖥️ 屏幕尺寸: {screen_width}x{screen_height}, 全屏模式: {self.is_fullscreen}")
+            logger.debug("屏幕尺寸: %dx%d, 全屏模式: %s", screen_width, screen_height, self.is_fullscreen)
 
             if self.is_fullscreen:
                 # 全屏模式：更精确的布局计算
@@ -392,7 +639,20 @@ class VisionMainWindow(QMainWindow):
                 frame_size = min(max_frame_width, max_frame_height, 550)  # 最大不超过550像素
                 frame_size = max(frame_size, 300)  # 最小不少于300像素
 
-                print(f"📐 全屏布局计算: 屏幕{screen_width}x{screen_height}, 可用{available_width}x{available_height}, frame_size={frame_size}")
+                # 调整结果显示区域高度，使用固定高度避免布局问题
+                result_height = min(280, int(screen_height * 0.25))  # 最大280像素或屏幕高度的25%
+                button_height = 45  # 稍微增大按钮高度（见 _SZ_*x45）
+            else:
+                frame_size, result_height, button_height = 400, 300, 40
+
+            # 布局参数未变化时跳过，避免重复的重新布局和重绘
+            layout_params = (self.is_fullscreen, frame_size, result_height, button_height)
+            if layout_params == self._last_layout:
+                return
+
+            if self.is_fullscreen:
+                logger.debug("全屏布局计算: 屏幕%dx%d, 可用%dx%d, frame_size=%d",
+                             screen_width, screen_height, available_width, available_height, frame_size)
 
                 # 设置E字母显示区域大小
                 self.ui.frame_e_letter.setMinimumSize(frame_size, frame_size)
@@ -402,36 +662,18 @@ class VisionMainWindow(QMainWindow):
                 self.ui.frame_camera.setMinimumSize(frame_size, frame_size)
                 self.ui.frame_camera.setMaximumSize(frame_size, frame_size)
 
-                # 调整结果显示区域高度，使用固定高度避免布局问题
-                result_height = min(280, int(screen_height * 0.25))  # 最大280像素或屏幕高度的25%
                 self.ui.textEdit_results.setMinimumSize(0, result_height)
                 self.ui.textEdit_results.setMaximumSize(16777215, result_height)
 
                 # 调整控制按钮的大小，防止重叠
-                button_height = 45  # 稍微增大按钮高度
-                self.ui.btn_start_camera.setMinimumSize(130, button_height)
-                self.ui.btn_start_test.setMinimumSize(110, button_height)
-                self.ui.btn_stop_test.setMinimumSize(110, button_height)
-                self.ui.btn_voice_toggle.setMinimumSize(130, button_height)
+                self.ui.btn_start_camera.setMinimumSize(_SZ_130x45)
+                self.ui.btn_start_test.setMinimumSize(_SZ_110x45)
+                self.ui.btn_stop_test.setMinimumSize(_SZ_110x45)
+                self.ui.btn_voice_toggle.setMinimumSize(_SZ_130x45)
 
                 # 在全屏模式下增大退出按钮
-                self.ui.btn_exit.setMinimumSize(120, button_height)
-                self.ui.btn_exit.setStyleSheet("""
-                    QPushButton#btn_exit {
-                        background-color: #dc3545;
-                        color: white;
-                        border: 3px solid #dc3545;
-                        border-radius: 10px;
-                        font-weight: bold;
-                        font-size: 16px;
-                        padding: 8px 16px;
-                        margin: 2px;
-                    }
-                    QPushButton#btn_exit:hover {
-                        background-color: #c82333;
-                        border-color: #c82333;
-                    }
-                """)
+                self.ui.btn_exit.setMinimumSize(_SZ_120x45)
+                self.ui.btn_exit.setStyleSheet(self._EXIT_BTN_QSS_FULL)
 
                 # 设置布局间距和边距
                 self.ui.verticalLayout_main.setSpacing(12)
@@ -442,24 +684,25 @@ class VisionMainWindow(QMainWindow):
 
             else:
                 # 窗口模式：恢复默认大小
-                self.ui.frame_e_letter.setMinimumSize(400, 400)
-                self.ui.frame_e_letter.setMaximumSize(400, 400)
+                self.ui.frame_e_letter.setMinimumSize(frame_size, frame_size)
+                self.ui.frame_e_letter.setMaximumSize(frame_size, frame_size)
 
-                self.ui.frame_camera.setMinimumSize(400, 400)
-                self.ui.frame_camera.setMaximumSize(400, 400)
+                self.ui.frame_camera.setMinimumSize(frame_size, frame_size)
+                self.ui.frame_camera.setMaximumSize(frame_size, frame_size)
 
-                self.ui.textEdit_results.setMinimumSize(0, 300)
-                self.ui.textEdit_results.setMaximumSize(16777215, 300)
+                self.ui.textEdit_results.setMinimumSize(0, result_height)
+                self.ui.textEdit_results.setMaximumSize(16777215, result_height)
 
                 # 恢复按钮默认大小
-                self.ui.btn_start_camera.setMinimumSize(120, 40)
-                self.ui.btn_start_test.setMinimumSize(100, 40)
-                self.ui.btn_stop_test.setMinimumSize(100, 40)
-                self.ui.btn_voice_toggle.setMinimumSize(120, 40)
-                self.ui.btn_exit.setMinimumSize(100, 40)
+                self.ui.btn_start_camera.setMinimumSize(_SZ_120x40)
+                self.ui.btn_start_test.setMinimumSize(_SZ_100x40)
+                self.ui.btn_stop_test.setMinimumSize(_SZ_100x40)
+                self.ui.btn_voice_toggle.setMinimumSize(_SZ_120x40)
+                self.ui.btn_exit.setMinimumSize(_SZ_100x40)
 
-                # 重新应用默认样式
-                self.setup_exit_button_style()
+                # 去掉全屏专用样式，回落到主题样式表中的默认规则
+                if self.ui.btn_exit.styleSheet():
+                    self.ui.btn_exit.setStyleSheet("")
 
                 # 恢复默认布局间距和边距
                 self.ui.verticalLayout_main.setSpacing(6)
@@ -468,62 +711,45 @@ class VisionMainWindow(QMainWindow):
                 self.ui.horizontalLayout_controls.setSpacing(6)
                 self.ui.horizontalLayout_gesture_info.setSpacing(6)
 
-            # 强制重新布局
+            # 强制重新布局；尺寸约束变化本身会触发重绘，无需再调用 update()
             self.ui.centralwidget.updateGeometry()
-            self.update()  # 使用update()而不是adjustSize()，更适合全屏模式
+            self._last_layout = layout_params
 
-        except Exception as e:
-            print(f"调整界面布局失败: {e}")
+        except Exception:
+            logger.exception("调整界面布局失败")
 
     def resizeEvent(self, event):
         """窗口大小变化事件处理"""
         super().resizeEvent(event)
-        try:
-            # 检查是否启用自适应布局
-            from config import get_system_config
-            system_config = get_system_config()
-            if system_config.get("adaptive_layout", True):
-                # 延迟调整布局，避免频繁调整
-                if hasattr(self, '_resize_timer'):
-                    self._resize_timer.stop()
-                else:
-                    from PySide6.QtCore import QTimer
-                    self._resize_timer = QTimer()
-                    self._resize_timer.setSingleShot(True)
-                    self._resize_timer.timeout.connect(self.adjust_layout_for_display_mode)
-
-                self._resize_timer.start(100)  # 100ms延迟
-        except Exception as e:
-            print(f"处理窗口大小变化失败: {e}")
+        # 延迟调整布局，避免频繁调整；start() 会重置正在计时的定时器
+        if self._adaptive_layout:
+            self._resize_timer.start(100)  # 100ms延迟
 
     def _init_voice_controller(self):
         """初始化语音控制器"""
         try:
             # 获取语音配置
-            voice_config = get_voice_config()
+            voice_config = self._voice_cfg
 
             # 检查是否启用语音功能
             if not voice_config.get("enabled", False):
-                self.ui.textEdit_results.append("🎤 语音控制功能已禁用（可在设置中启用或点击语音按钮手动启用）")
+                self._append_line("🎤 语音控制功能已禁用（可在设置中启用或点击语音按钮手动启用）")
                 return
 
             self.voice_controller = VoiceController()
 
             # 连接语音控制信号
-            self.voice_controller.direction_command.connect(self.handle_voice_direction)
-            self.voice_controller.test_control_command.connect(self.handle_voice_test_control)
-            self.voice_controller.system_control_command.connect(self.handle_voice_system_control)
-            self.voice_controller.voice_status_changed.connect(self.update_voice_status)
-            self.voice_controller.voice_error.connect(self.handle_voice_error)
-            self.voice_controller.command_feedback.connect(self.show_voice_feedback)
+            self.setup_voice_connections()
 
             # 检查语音功能是否可用
             if self.voice_controller.is_voice_available():
-                self.ui.textEdit_results.append("🌐 火山引擎语音控制功能已就绪")
-                self.ui.textEdit_results.append("⚡ 在线识别，高精度，专业语音引擎")
-                self.ui.textEdit_results.append("🎯 支持多种语音命令，实时流式识别")
-                self.ui.textEdit_results.append("测试命令：开始测试、停止测试、向上/朝上、向下/朝下、向左/朝左、向右/朝右")
-                self.ui.textEdit_results.append("系统命令：启动摄像头、关闭摄像头、打开设置、保存结果、导出报告")
+                self._log_lines([
+                    "🌐 火山引擎语音控制功能已就绪",
+                    "⚡ 在线识别，高精度，专业语音引擎",
+                    "🎯 支持多种语音命令，实时流式识别",
+                    "测试命令：开始测试、停止测试、向上/朝上、向下/朝下、向左/朝左、向右/朝右",
+                    "系统命令：启动摄像头、关闭摄像头、打开设置、保存结果、导出报告",
+                ])
 
                 # 显示火山引擎语音识别状态
                 self._show_volcengine_voice_status()
@@ -531,28 +757,21 @@ class VisionMainWindow(QMainWindow):
                 # 根据配置决定是否自动启用语音控制（默认关闭）
                 if voice_config.get("auto_start", False):
                     if self.voice_controller.enable_voice_control():
-                        self.ui.textEdit_results.append("✅ 火山引擎语音控制已自动启用")
-                        self.ui.btn_voice_toggle.setChecked(True)
-                        self.ui.btn_voice_toggle.setText("�️ 语音识别 (开)")
-                        self.ui.btn_voice_toggle.setStyleSheet("background-color: #4CAF50; color: white;")
+                        self._append_line("✅ 火山引擎语音控制已自动启用")
+                        self._set_voice_button(True, "🎙️ 语音识别 (开)", self._VOICE_ON_QSS)
                     else:
-                        self.ui.textEdit_results.append("⚠️ 火山引擎语音控制启用失败")
-                        self.ui.btn_voice_toggle.setChecked(False)
-                        self.ui.btn_voice_toggle.setText("�️ 语音识别 (关)")
-                        self.ui.btn_voice_toggle.setStyleSheet("background-color: #6c757d; color: white;")
+                        self._append_line("⚠️ 火山引擎语音控制启用失败")
+                        self._set_voice_button(False, "🎙️ 语音识别 (关)", self._VOICE_OFF_QSS)
                 else:
-                    self.ui.textEdit_results.append("💡 火山引擎语音控制已就绪，点击按钮手动启用")
-                    self.ui.btn_voice_toggle.setChecked(False)
-                    self.ui.btn_voice_toggle.setText("�️ 语音识别 (关)")
-                    self.ui.btn_voice_toggle.setStyleSheet("background-color: #6c757d; color: white;")
+                    self._append_line("💡 火山引擎语音控制已就绪，点击按钮手动启用")
+                    self._set_voice_button(False, "🎙️ 语音识别 (关)", self._VOICE_OFF_QSS)
             else:
-                self.ui.textEdit_results.append("⚠️ 火山引擎语音控制功能不可用")
+                self._append_line("⚠️ 火山引擎语音控制功能不可用")
                 self._show_voice_configuration_prompt()
 
         except Exception as e:
-            print(f"语音控制器初始化失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 语音控制器初始化失败: {str(e)}")
-            self.ui.textEdit_results.append("💡 请在设置中检查语音配置")
+            logger.exception("语音控制器初始化失败")
+            self._log_lines([f"❌ 语音控制器初始化失败: {str(e)}", "💡 请在设置中检查语音配置"])
             # 禁用语音控制按钮
             self.ui.btn_voice_toggle.setEnabled(False)
             self.ui.btn_voice_toggle.setText("🎤 语音错误")
@@ -562,142 +781,122 @@ class VisionMainWindow(QMainWindow):
         """处理语音方向命令"""
         try:
             # 将语音方向转换为系统方向格式
-            direction_map = {
-                "up": "Up",
-                "down": "Down",
-                "left": "Left",
-                "right": "Right"
-            }
+            system_direction = _VOICE_DIRECTIONS.get(direction)
 
-            if direction in direction_map:
-                system_direction = direction_map[direction]
-                self.ui.textEdit_results.append(f"🎤 语音方向: {direction} → {system_direction}")
+            if system_direction is not None:
+                self._append_line(_format_msg(_FMT_VOICE_DIR, direction, system_direction))
 
                 # 如果正在测试，执行测试逻辑
                 if self.is_testing:
                     self.handle_test_direction(system_direction)
                 else:
                     # 如果没有在测试，只显示识别结果
-                    self.ui.textEdit_results.append(f"✅ 方向识别成功: {system_direction} (当前未在测试模式)")
+                    self._append_line(_format_msg(_FMT_DIR_IDLE, system_direction))
                     # 更新方向显示，让用户看到识别效果
                     self.ui.label_current_direction.setText(system_direction)
-                    color_map = {"Up": "blue", "Down": "orange", "Left": "purple", "Right": "green"}
-                    color = color_map.get(system_direction, "red")
-                    self.ui.label_current_direction.setStyleSheet(f"font-size: 16px; font-weight: bold; color: {color};")
+                    self.ui.label_current_direction.setStyleSheet(
+                        self._DIR_STYLES.get(system_direction, self._DIR_STYLE_DEFAULT))
             else:
-                self.ui.textEdit_results.append(f"❌ 未知方向命令: {direction}")
+                self._append_line(f"❌ 未知方向命令: {direction}")
 
-        except Exception as e:
-            print(f"处理语音方向命令失败: {e}")
+        except Exception:
+            logger.exception("处理语音方向命令失败")
 
     def handle_voice_test_control(self, command):
         """处理语音测试控制命令"""
         try:
             if command == "start_test":
-                self.ui.textEdit_results.append("🎤 语音命令: 开始测试")
+                self._append_line("🎤 语音命令: 开始测试")
                 if not self.is_testing:
                     self.start_test()
                 else:
-                    self.ui.textEdit_results.append("⚠️ 测试已在进行中")
+                    self._append_line("⚠️ 测试已在进行中")
 
             elif command == "stop_test":
-                self.ui.textEdit_results.append("🎤 语音命令: 停止测试")
+                self._append_line("🎤 语音命令: 停止测试")
                 if self.is_testing:
                     self.stop_test()
                 else:
-                    self.ui.textEdit_results.append("⚠️ 当前没有进行测试")
+                    self._append_line("⚠️ 当前没有进行测试")
             else:
-                self.ui.textEdit_results.append(f"❌ 未知测试控制命令: {command}")
+                self._append_line(f"❌ 未知测试控制命令: {command}")
 
-        except Exception as e:
-            print(f"处理语音测试控制命令失败: {e}")
+        except Exception:
+            logger.exception("处理语音测试控制命令失败")
 
     def handle_voice_system_control(self, command):
         """处理语音系统控制命令"""
         try:
             if command == "start_camera":
-                self.ui.textEdit_results.append("🎤 语音命令: 启动摄像头")
-
-                # 检查摄像头状态
-                camera_running = (hasattr(self, 'camera_handler') and
-                                self.camera_handler and
-                                hasattr(self.camera_handler, 'running') and
-                                self.camera_handler.running)
-
-                if not camera_running:
-                    self.ui.textEdit_results.append("📷 正在启动摄像头...")
+                if not self._camera_running:
+                    self._log_lines(["🎤 语音命令: 启动摄像头", "📷 正在启动摄像头..."])
                     self.start_camera_and_gesture()
                 else:
-                    self.ui.textEdit_results.append("⚠️ 摄像头已经启动")
+                    self._log_lines(["🎤 语音命令: 启动摄像头", "⚠️ 摄像头已经启动"])
 
             elif command == "stop_camera":
-                self.ui.textEdit_results.append("🎤 语音命令: 关闭摄像头")
-
-                # 检查摄像头状态
-                camera_running = (hasattr(self, 'camera_handler') and
-                                self.camera_handler and
-                                hasattr(self.camera_handler, 'running') and
-                                self.camera_handler.running)
-
-                if camera_running:
-                    self.ui.textEdit_results.append("📷 正在关闭摄像头...")
+                if self._camera_running:
+                    self._log_lines(["🎤 语音命令: 关闭摄像头", "📷 正在关闭摄像头..."])
                     self.stop_camera()
                 else:
-                    self.ui.textEdit_results.append("⚠️ 摄像头未启动")
+                    self._log_lines(["🎤 语音命令: 关闭摄像头", "⚠️ 摄像头未启动"])
 
             elif command == "open_settings":
-                self.ui.textEdit_results.append("🎤 语音命令: 打开设置")
+                self._append_line("🎤 语音命令: 打开设置")
                 self.show_settings()
 
             elif command == "save_results":
-                self.ui.textEdit_results.append("🎤 语音命令: 保存结果")
-                self.ui.textEdit_results.append("💡 保存功能已移除")
+                self._log_lines(["🎤 语音命令: 保存结果", "💡 保存功能已移除"])
 
             elif command == "export_report":
-                self.ui.textEdit_results.append("🎤 语音命令: 导出报告")
-                self.ui.textEdit_results.append("💡 导出功能已移除")
+                self._log_lines(["🎤 语音命令: 导出报告", "💡 导出功能已移除"])
 
             else:
-                self.ui.textEdit_results.append(f"❌ 未知系统控制命令: {command}")
+                self._append_line(f"❌ 未知系统控制命令: {command}")
 
-        except Exception as e:
-            print(f"处理语音系统控制命令失败: {e}")
+        except Exception:
+            logger.exception("处理语音系统控制命令失败")
 
     def toggle_voice_control(self):
         """切换语音控制开关"""
         try:
             if not self.voice_controller or not self.voice_controller.is_voice_available():
-                self.ui.textEdit_results.append("❌ 语音控制功能不可用")
+                self._append_line("❌ 语音控制功能不可用")
                 return
 
             if self.ui.btn_voice_toggle.isChecked():
                 # 启用语音控制
                 if self.voice_controller.enable_voice_control():
-                    self.ui.textEdit_results.append("✅ 火山引擎语音控制已启用")
-                    self.ui.btn_voice_toggle.setText("🌐 火山引擎 (开)")
-                    self.ui.btn_voice_toggle.setStyleSheet("background-color: #4CAF50; color: white;")
+                    self._append_line("✅ 火山引擎语音控制已启用")
+                    self._set_voice_button(True, "🌐 火山引擎 (开)", self._VOICE_ON_QSS)
                 else:
-                    self.ui.textEdit_results.append("❌ 火山引擎语音控制启用失败")
-                    self.ui.btn_voice_toggle.setChecked(False)
-                    self.ui.btn_voice_toggle.setText("🌐 火山引擎 (关)")
-                    self.ui.btn_voice_toggle.setStyleSheet("background-color: #f44336; color: white;")
+                    self._append_line("❌ 火山引擎语音控制启用失败")
+                    self._set_voice_button(False, "🌐 火山引擎 (关)", self._VOICE_FAIL_QSS)
             else:
                 # 禁用语音控制
                 self.voice_controller.disable_voice_control()
-                self.ui.textEdit_results.append("⏹️ 火山引擎语音控制已禁用")
-                self.ui.btn_voice_toggle.setText("🌐 火山引擎 (关)")
-                self.ui.btn_voice_toggle.setStyleSheet("background-color: #f44336; color: white;")
+                self._append_line("⏹️ 火山引擎语音控制已禁用")
+                self._set_voice_button(False, "🌐 火山引擎 (关)", self._VOICE_FAIL_QSS)
 
         except Exception as e:
-            print(f"切换语音控制失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 切换语音控制失败: {str(e)}")
+            logger.exception("切换语音控制失败")
+            self._append_line(f"❌ 切换语音控制失败: {str(e)}")
+
+    def _set_voice_button(self, state, label, qss):
+        """一次性更新语音按钮的选中状态、文字和样式，期间屏蔽按钮信号"""
+        button = self.ui.btn_voice_toggle
+        with QSignalBlocker(button):
+            button.setChecked(state)
+            button.setText(label)
+            button.setStyleSheet(qss)
 
     def stop_camera(self):
         """停止摄像头"""
         try:
-            if hasattr(self, 'camera_handler') and self.camera_handler:
+            if self.camera_handler is not None:
                 self.camera_handler.stop_camera()
                 self.camera_handler = None
+                self._camera_running = False
 
                 # 恢复按钮状态
                 self.ui.btn_start_camera.setEnabled(True)
@@ -712,83 +911,106 @@ class VisionMainWindow(QMainWindow):
                 self.ui.label_gesture_status.setText("未启动")
                 self.ui.label_gesture_status.setStyleSheet("font-size: 14px; color: red;")
                 self.ui.label_current_direction.setText("None")
-                self.ui.label_current_direction.setStyleSheet("font-size: 16px; font-weight: bold; color: red;")
+                self.ui.label_current_direction.setStyleSheet(self._DIR_STYLE_DEFAULT)
 
-                self.ui.textEdit_results.append("📷 摄像头已关闭")
+                self._append_line("📷 摄像头已关闭")
             else:
-                self.ui.textEdit_results.append("⚠️ 摄像头未启动")
+                self._append_line("⚠️ 摄像头未启动")
         except Exception as e:
-            print(f"停止摄像头失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 停止摄像头失败: {str(e)}")
+            logger.exception("停止摄像头失败")
+            self._append_line(f"❌ 停止摄像头失败: {str(e)}")
+
+    def _exec_settings_dialog(self, tab_index=None):
+        """打开设置对话框：复用已构造的实例，取消时丢弃以免保留未保存的修改"""
+        dialog = self._settings_dialog
+        if dialog is None:
+            dialog = self._settings_dialog = SettingsDialog(self)
+        if tab_index is not None:
+            dialog.tab_widget.setCurrentIndex(tab_index)
+        result = dialog.exec()
+        if result != dialog.DialogCode.Accepted:
+            # 控件中可能残留未保存的修改，下次打开时重新构造
+            self._settings_dialog = None
+            dialog.deleteLater()
+        return result
 
     def show_settings(self):
         """显示设置对话框"""
         try:
-            dialog = SettingsDialog(self)
-            if dialog.exec() == dialog.DialogCode.Accepted:
-                self.ui.textEdit_results.append("✅ 设置已更新")
+            if self._exec_settings_dialog() == SettingsDialog.DialogCode.Accepted:
+                self._append_line("✅ 设置已更新")
                 # 重新加载配置
                 self.reload_configurations()
             else:
-                self.ui.textEdit_results.append("⚠️ 设置已取消")
+                self._append_line("⚠️ 设置已取消")
         except Exception as e:
-            print(f"显示设置对话框失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 打开设置失败: {str(e)}")
+            logger.exception("显示设置对话框失败")
+            self._append_line(f"❌ 打开设置失败: {str(e)}")
 
     # 已移除测试结果保存和导出功能
 
     def reload_configurations(self):
         """重新加载配置"""
         try:
+            # 刷新配置快照
+            _volcengine_status.cache_clear()
+            self._sys_cfg = get_system_config()
+            self._voice_cfg = get_voice_config()
+            self._adaptive_layout = self._sys_cfg.get("adaptive_layout", True)
+
+            # API配置可能已变化，AI诊断实例下次使用时重建（正在运行的诊断线程仍持有旧实例）
+            self.ai_diagnosis = None
+
             # 重新加载语音配置
             if self.voice_controller:
-                from config import get_voice_config
-                voice_config = get_voice_config()
-                self.voice_controller.voice_engine.update_config(voice_config)
-                self.ui.textEdit_results.append("🔄 语音配置已重新加载")
+                self.voice_controller.voice_engine.update_config(self._voice_cfg)
+                self._append_line("🔄 语音配置已重新加载")
 
             # 重新加载其他配置...
-            self.ui.textEdit_results.append("🔄 配置重新加载完成")
+            self._append_line("🔄 配置重新加载完成")
 
         except Exception as e:
-            print(f"重新加载配置失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 重新加载配置失败: {str(e)}")
+            logger.exception("重新加载配置失败")
+            self._append_line(f"❌ 重新加载配置失败: {str(e)}")
 
     def _show_volcengine_voice_status(self):
         """显示火山引擎语音识别状态"""
         try:
             # 检查火山引擎配置
-            from config import get_voice_config, is_volcengine_configured
-            voice_config = get_voice_config()
-            volcengine_config = voice_config.get("volcengine", {})
-
-            if is_volcengine_configured():
-                app_id = volcengine_config.get("app_id", "")
-                self.ui.textEdit_results.append(f"📋 火山引擎语音识别: ✅ 已配置（APP ID: {app_id[:8]}...）")
-                self.ui.textEdit_results.append("💡 特色: 在线识别 | 高精度 | 专业引擎 | 实时流式")
+            configured, app_id = _volcengine_status()
+
+            if configured:
+                self._log_lines([
+                    f"📋 火山引擎语音识别: ✅ 已配置（APP ID: {app_id[:8]}...）",
+                    "💡 特色: 在线识别 | 高精度 | 专业引擎 | 实时流式",
+                ])
             else:
-                self.ui.textEdit_results.append("📋 火山引擎语音识别: ⚠️ 未配置（需要APP ID和Access Token）")
-                self.ui.textEdit_results.append("💡 请在设置中配置火山引擎参数")
+                self._log_lines([
+                    "📋 火山引擎语音识别: ⚠️ 未配置（需要APP ID和Access Token）",
+                    "💡 请在设置中配置火山引擎参数",
+                ])
 
-        except Exception as e:
-            print(f"显示火山引擎语音状态失败: {e}")
+        except Exception:
+            logger.exception("显示火山引擎语音状态失败")
 
     def _show_voice_configuration_prompt(self):
         """显示火山引擎语音识别配置提示"""
         try:
-            self.ui.textEdit_results.append("💡 火山引擎语音控制需要配置API参数")
-            self.ui.textEdit_results.append("🔧 需要配置: APP ID、Access Token、Secret Key")
-            self.ui.textEdit_results.append("⚙️ 请在 设置 → 🎤 语音设置 中配置火山引擎参数")
-            self.ui.textEdit_results.append("🌐 配置后可享受高精度在线语音识别功能")
-            self.ui.textEdit_results.append("🎯 特色: 在线识别 | 高精度 | 专业引擎 | 实时流式")
+            self._log_lines([
+                "💡 火山引擎语音控制需要配置API参数",
+                "🔧 需要配置: APP ID、Access Token、Secret Key",
+                "⚙️ 请在 设置 → 🎤 语音设置 中配置火山引擎参数",
+                "🌐 配置后可享受高精度在线语音识别功能",
+                "🎯 特色: 在线识别 | 高精度 | 专业引擎 | 实时流式",
+            ])
 
             # 禁用语音控制按钮
             self.ui.btn_voice_toggle.setEnabled(False)
             self.ui.btn_voice_toggle.setText("🌐 需要配置")
             self.ui.btn_voice_toggle.setStyleSheet("background-color: #cccccc; color: #666666;")
 
-        except Exception as e:
-            print(f"显示语音配置提示失败: {e}")
+        except Exception:
+            logger.exception("显示语音配置提示失败")
 
     # 已移除离线语音识别安装相关代码，现在使用火山引擎语音识别
 
@@ -796,16 +1018,16 @@ class VisionMainWindow(QMainWindow):
         """更新语音状态显示"""
         try:
             # 在状态栏或结果区域显示语音状态
-            self.ui.textEdit_results.append(f"🎤 {status}")
-        except Exception as e:
-            print(f"更新语音状态失败: {e}")
+            self._append_line(f"🎤 {status}")
+        except Exception:
+            logger.exception("更新语音状态失败")
 
     def handle_voice_error(self, error_msg):
         """处理语音错误"""
         try:
-            self.ui.textEdit_results.append(f"🎤 ❌ 语音错误: {error_msg}")
-        except Exception as e:
-            print(f"处理语音错误失败: {e}")
+            self._append_line(f"🎤 ❌ 语音错误: {error_msg}")
+        except Exception:
+            logger.exception("处理语音错误失败")
 
     def show_voice_feedback(self, feedback_type, message):
         """显示语音命令反馈"""
@@ -815,130 +1037,104 @@ class VisionMainWindow(QMainWindow):
                 self._clear_last_voice_feedback()
                 return
 
-            feedback_icons = {
-                "direction": "🎯",
-                "control": "🎮",
-                "system": "⚙️",
-                "warning": "⚠️",
-                "error": "❌"
-            }
-
-            icon = feedback_icons.get(feedback_type, "🎤")
+            icon = self._FEEDBACK_ICONS.get(feedback_type, "🎤")
 
             # 🔥 修复：在AI诊断期间，使用更突出的显示方式
-            if hasattr(self, 'ai_diagnosis_thread') and self.ai_diagnosis_thread and self.ai_diagnosis_thread.isRunning():
+            if self.ai_diagnosis_thread is not None and self.ai_diagnosis_thread.isRunning():
                 # AI诊断进行中，使用更突出的格式
-                feedback_message = f"\n>>> {icon} {message} <<<\n"
+                feedback_message = f">>> {icon} {message} <<<"
             else:
                 # 正常情况
                 feedback_message = f"{icon} {message}"
 
-            # 记录这是一条语音反馈消息
-            self._last_voice_feedback_message = feedback_message
-            self.ui.textEdit_results.append(feedback_message)
+            # 反馈作为独立的一段写入，记录该段落以便之后精确移除
+            self._append_line(feedback_message)
+            block = self.ui.textEdit_results.document().lastBlock()
+            self._last_voice_feedback_cursor = QTextCursor(block)
+            self._last_voice_feedback_text = block.text()
 
             # 🔥 确保滚动到底部，让用户看到反馈
-            scrollbar = self.ui.textEdit_results.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            self._scroll_results_to_bottom()
 
-        except Exception as e:
-            print(f"显示语音反馈失败: {e}")
+        except Exception:
+            logger.exception("显示语音反馈失败")
 
     def _clear_last_voice_feedback(self):
         """清除最后一条语音反馈消息"""
         try:
-            if not hasattr(self, '_last_voice_feedback_message') or not self._last_voice_feedback_message:
+            cursor = self._last_voice_feedback_cursor
+            if cursor is None:
                 return
 
-            current_text = self.ui.textEdit_results.toPlainText()
-            lines = current_text.split('\n')
-
-            # 🔥 修复：查找并移除语音反馈消息（不限于最后一行）
-            # 从后往前查找最后一条语音反馈消息
-            for i in range(len(lines) - 1, -1, -1):
-                if self._last_voice_feedback_message in lines[i]:
-                    # 移除找到的语音反馈行
-                    lines.pop(i)
-                    self.ui.textEdit_results.setPlainText('\n'.join(lines))
-
-                    # 滚动到底部
-                    scrollbar = self.ui.textEdit_results.verticalScrollBar()
-                    scrollbar.setValue(scrollbar.maximum())
-                    break
+            # 锚定光标随文档编辑移动，仍指向写入的那一段；段落文本不符（如已被截断移除）时不删除
+            doc = self.ui.textEdit_results.document()
+            cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+            if cursor.block().text() == self._last_voice_feedback_text:
+                is_first_block = not cursor.block().previous().isValid()
+                cursor.beginEditBlock()
+                # BlockUnderCursor 会连同前一个段落分隔符一起选中
+                cursor.select(QTextCursor.SelectionType.BlockUnderCursor)
+                cursor.removeSelectedText()
+                if is_first_block and doc.blockCount() > 1:
+                    # 首段没有前置分隔符，删除其后的分隔符
+                    cursor.deleteChar()
+                cursor.endEditBlock()
+
+                # 滚动到底部
+                self._scroll_results_to_bottom()
 
             # 清除记录
-            self._last_voice_feedback_message = None
+            self._last_voice_feedback_cursor = None
+            self._last_voice_feedback_text = None
 
-        except Exception as e:
-            print(f"清除语音反馈失败: {e}")
+        except Exception:
+            logger.exception("清除语音反馈失败")
 
     def safe_exit(self):
         """安全退出程序"""
         try:
             # 显示退出确认信息
-            self.ui.textEdit_results.append("🚪 正在安全退出程序...")
+            self._append_line("🚪 正在安全退出程序...")
 
             # 停止摄像头
-            if hasattr(self, 'camera_handler') and self.camera_handler:
-                self.ui.textEdit_results.append("📷 正在关闭摄像头...")
+            if self.camera_handler is not None:
+                self._append_line("📷 正在关闭摄像头...")
                 self.camera_handler.stop_camera()
 
             # 停止语音控制
-            if hasattr(self, 'voice_controller') and self.voice_controller:
-                self.ui.textEdit_results.append("🎤 正在关闭语音控制...")
+            if self.voice_controller is not None:
+                self._append_line("🎤 正在关闭语音控制...")
                 self.voice_controller.disable_voice_control()
 
-            # 停止AI诊断线程
-            if hasattr(self, 'ai_diagnosis_thread') and self.ai_diagnosis_thread:
-                self.ui.textEdit_results.append("🤖 正在停止AI诊断...")
-                self.ai_diagnosis_thread.quit()
-                self.ai_diagnosis_thread.wait(1000)  # 等待最多1秒
-
-            self.ui.textEdit_results.append("✅ 程序已安全退出")
+            # 停止AI诊断线程：只请求中断，由定时器轮询线程结束，界面不被阻塞
+            if self.ai_diagnosis_thread is not None:
+                self._append_line("🤖 正在停止AI诊断...")
+                self.ai_diagnosis_thread.stop(wait=False)
 
-            # 延迟一点时间让用户看到退出信息
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(500, self.close)
+            self._exit_deadline = time.monotonic() + self._EXIT_THREAD_TIMEOUT
+            QTimer.singleShot(0, self._finish_exit_when_thread_done)
 
-        except Exception as e:
-            print(f"安全退出失败: {e}")
+        except Exception:
+            logger.exception("安全退出失败")
             # 如果安全退出失败，直接关闭
             self.close()
 
-    def setup_exit_button_style(self):
-        """设置退出按钮样式"""
-        try:
-            # 为退出按钮设置醒目的红色样式
-            exit_button_style = """
-                QPushButton#btn_exit {
-                    background-color: #dc3545;
-                    color: white;
-                    border: 2px solid #dc3545;
-                    border-radius: 8px;
-                    font-weight: bold;
-                    font-size: 14px;
-                    padding: 8px 16px;
-                }
-                QPushButton#btn_exit:hover {
-                    background-color: #c82333;
-                    border-color: #c82333;
-                    transform: scale(1.05);
-                }
-                QPushButton#btn_exit:pressed {
-                    background-color: #bd2130;
-                    border-color: #bd2130;
-                }
-            """
-
-            # 应用样式到退出按钮
-            current_style = self.styleSheet()
-            self.setStyleSheet(current_style + exit_button_style)
-
-            # 设置按钮提示文本
-            self.ui.btn_exit.setToolTip("退出程序 (Ctrl+Q)")
+    def _finish_exit_when_thread_done(self):
+        """AI诊断线程结束（或等待超时）后关闭窗口"""
+        thread = self.ai_diagnosis_thread
+        if (thread is not None and thread.isRunning()
+                and time.monotonic() < self._exit_deadline):
+            QTimer.singleShot(50, self._finish_exit_when_thread_done)
+            return
 
-        except Exception as e:
-            print(f"设置退出按钮样式失败: {e}")
+        self._append_line("✅ 程序已安全退出")
+
+        # 延迟一点时间让用户看到退出信息
+        QTimer.singleShot(500, self.close)
+
+    def setup_exit_button_style(self):
+        """设置退出按钮样式：样式规则位于主题样式表中，这里只设置提示文本"""
+        self.ui.btn_exit.setToolTip("退出程序 (Ctrl+Q)")
 
     def setup_connections(self):
         """设置信号连接"""
@@ -962,47 +1158,38 @@ class VisionMainWindow(QMainWindow):
 
     def setup_voice_connections(self):
         """设置语音控制器信号连接"""
+        # 连接是持久的，只需建立一次
+        if self._voice_connected:
+            return
         try:
-            if hasattr(self, 'voice_controller') and self.voice_controller:
-                # 断开可能存在的旧连接（避免重复连接）
-                try:
-                    self.voice_controller.direction_command.disconnect()
-                    self.voice_controller.test_control_command.disconnect()
-                    self.voice_controller.system_control_command.disconnect()
-                    self.voice_controller.voice_status_changed.disconnect()
-                    self.voice_controller.voice_error.disconnect()
-                    self.voice_controller.command_feedback.disconnect()
-                except:
-                    pass  # 忽略断开连接的错误
-
-                # 重新连接语音控制信号
-                self.voice_controller.direction_command.connect(self.handle_voice_direction)
-                self.voice_controller.test_control_command.connect(self.handle_voice_test_control)
-                self.voice_controller.system_control_command.connect(self.handle_voice_system_control)
-                self.voice_controller.voice_status_changed.connect(self.update_voice_status)
-                self.voice_controller.voice_error.connect(self.handle_voice_error)
-                self.voice_controller.command_feedback.connect(self.show_voice_feedback)
-
-                print("✅ 语音控制器信号连接已重新建立")
-        except Exception as e:
-            print(f"设置语音控制器信号连接失败: {e}")
+            if self.voice_controller:
+                # 连接语音控制信号
+                vc = self.voice_controller
+                vc.direction_command.connect(self.handle_voice_direction)
+                vc.test_control_command.connect(self.handle_voice_test_control)
+                vc.system_control_command.connect(self.handle_voice_system_control)
+                vc.voice_status_changed.connect(self.update_voice_status)
+                vc.voice_error.connect(self.handle_voice_error)
+                vc.command_feedback.connect(self.show_voice_feedback)
+                self._voice_connected = True
+
+                logger.debug("语音控制器信号连接已建立")
+        except Exception:
+            logger.exception("设置语音控制器信号连接失败")
 
     def toggle_camera(self):
         """切换摄像头状态"""
         try:
             # 检查摄像头是否已启动
-            if (hasattr(self, 'camera_handler') and
-                self.camera_handler and
-                hasattr(self.camera_handler, 'running') and
-                self.camera_handler.running):
+            if self.camera_handler is not None and self.camera_handler.running:
                 # 摄像头已启动，停止它
                 self.stop_camera()
             else:
                 # 摄像头未启动，启动它
                 self.start_camera_and_gesture()
         except Exception as e:
-            print(f"切换摄像头状态失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 切换摄像头状态失败: {str(e)}")
+            logger.exception("切换摄像头状态失败")
+            self._append_line(f"❌ 切换摄像头状态失败: {str(e)}")
     
     def start_camera_and_gesture(self):
         """启动摄像头和手势识别"""
@@ -1012,17 +1199,14 @@ class VisionMainWindow(QMainWindow):
 
         try:
             # 如果摄像头已经启动，直接返回
-            if (hasattr(self, 'camera_handler') and
-                self.camera_handler and
-                hasattr(self.camera_handler, 'running') and
-                self.camera_handler.running):
-                self.ui.textEdit_results.append("⚠️ 摄像头已经启动")
+            if self.camera_handler is not None and self.camera_handler.running:
+                self._append_line("⚠️ 摄像头已经启动")
                 return
 
             # 立即禁用按钮，防止重复点击
             self.ui.btn_start_camera.setEnabled(False)
             self.ui.btn_start_camera.setText("启动中...")
-            self.ui.textEdit_results.append("📷 正在启动摄像头...")
+            self._append_line("📷 正在启动摄像头...")
 
             # 强制刷新界面
             QApplication.processEvents()
@@ -1045,94 +1229,92 @@ class VisionMainWindow(QMainWindow):
                 brightness=brightness,
                 contrast=contrast
             )
-            self.communication = MockCommunication()
-            # 初始化AI诊断（使用配置文件）
-            config = get_siliconflow_config()
-            self.ai_diagnosis = AIVisionDiagnosis(
-                api_key=config.get("api_key"),
-                model=config.get("default_model")
-                # 不在这里设置回调，由线程处理
-            )
+            # 通信模块和AI诊断只创建一次，反复开关摄像头时复用
+            if self.communication is None:
+                self.communication = MockCommunication()
+                # 连接通信信号
+                self.communication.finger_direction_received.connect(self.handle_finger_direction)
+                self.communication.distance_received.connect(self.update_distance)
+                self.communication.connection_status_changed.connect(self.handle_connection_status)
+            self._ensure_ai_diagnosis()
 
-            print(f"已加载配置 - 摄像头: {camera_index}, 分辨率: {resolution}, 帧率: {fps}")
-            print(f"API配置 - 模型: {config.get('default_model')}, 密钥: {'已配置' if config.get('api_key') else '未配置'}")
+            logger.info("已加载配置 - 摄像头: %s, 分辨率: %s, 帧率: %s", camera_index, resolution, fps)
 
             # 连接摄像头信号
-            self.camera_handler.frame_ready.connect(self.update_camera_display)
+            # 显示槽只读取帧数据，保持队列连接跨线程投递，帧在采集线程中已保证内存连续
+            self.camera_handler.frame_ready.connect(
+                self.update_camera_display, Qt.ConnectionType.QueuedConnection)
             self.camera_handler.distance_updated.connect(self.update_distance)
             self.camera_handler.finger_direction_detected.connect(self.handle_finger_direction)
             self.camera_handler.gesture_status_changed.connect(self.update_gesture_status)
 
-            # 连接通信信号
-            self.communication.finger_direction_received.connect(self.handle_finger_direction)
-            self.communication.distance_received.connect(self.update_distance)
-            self.communication.connection_status_changed.connect(self.handle_connection_status)
-
             # 启动摄像头
             camera_started = self.camera_handler.start_camera()
 
             if camera_started:
+                self._camera_running = True
                 self.ui.btn_start_test.setEnabled(True)
                 self.ui.btn_start_camera.setText("已启动")
                 self.ui.btn_start_camera.setStyleSheet("background-color: #4CAF50; color: white;")
                 self.ui.label_gesture_status.setText("运行中")
                 self.ui.label_gesture_status.setStyleSheet("font-size: 14px; color: green;")
-                self.ui.textEdit_results.append("✅ 摄像头启动成功")
+                self._append_line("✅ 摄像头启动成功")
 
                 # 启动通信
                 self.communication.connect_device()
 
-                # 重新建立语音控制器信号连接（关键修复）
-                self.setup_voice_connections()
-                self.ui.textEdit_results.append("🎤 语音控制信号连接已重新建立")
-
                 # 不重新启用按钮，保持"已启动"状态
             else:
                 # 启动失败，恢复按钮状态
                 self.ui.btn_start_camera.setEnabled(True)
                 self.ui.btn_start_camera.setText("重试启动")
                 self.ui.btn_start_camera.setStyleSheet("")
-                self.ui.textEdit_results.append("❌ 摄像头启动失败，请检查摄像头连接")
+                self._append_line("❌ 摄像头启动失败，请检查摄像头连接")
 
         except Exception as e:
             # 异常处理，恢复按钮状态
             self.ui.btn_start_camera.setEnabled(True)
             self.ui.btn_start_camera.setText("重试启动")
             self.ui.btn_start_camera.setStyleSheet("")
-            self.ui.textEdit_results.append(f"❌ 摄像头启动异常: {str(e)}")
-            print(f"摄像头启动异常: {e}")
-            traceback.print_exc()
+            self._append_line(f"❌ 摄像头启动异常: {str(e)}")
+            logger.exception("摄像头启动异常")
     
+    def _ensure_ai_diagnosis(self):
+        """按需创建AI诊断实例（使用配置文件），配置更新后由 reload_configurations 置空重建"""
+        if self.ai_diagnosis is None:
+            config = get_siliconflow_config()
+            self.ai_diagnosis = AIVisionDiagnosis(
+                api_key=config.get("api_key"),
+                model=config.get("default_model")
+                # 不在这里设置回调，由线程处理
+            )
+            logger.info("API配置 - 模型: %s, 密钥: %s", config.get('default_model'),
+                        '已配置' if config.get('api_key') else '未配置')
+        return self.ai_diagnosis
+
     def update_camera_display(self, frame):
         """更新摄像头显示"""
         try:
             if frame is not None and frame.size > 0:
-                pixmap = self.camera_handler.numpy_to_qpixmap(frame)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(self.ui.label_camera.size(), Qt.AspectRatioMode.KeepAspectRatio)
+                # 持有当前帧引用，保证零拷贝包装的QImage在缩放期间缓冲区有效
+                self._display_frame = frame
+                scaled_pixmap = self.camera_handler.numpy_to_scaled_qpixmap(frame, self._camera_label_size)
+                if not scaled_pixmap.isNull():
                     self.ui.label_camera.setPixmap(scaled_pixmap)
                 else:
                     self.ui.label_camera.setText("摄像头画面处理失败")
             else:
                 self.ui.label_camera.setText("摄像头无画面")
         except Exception as e:
-            print(f"更新摄像头显示失败: {e}")
+            logger.exception("更新摄像头显示失败")
             self.ui.label_camera.setText(f"摄像头错误: {str(e)}")
     
     def handle_finger_direction(self, direction):
         """优化版本：处理手指方向信号"""
-        # 预定义颜色映射，避免重复创建字典
-        if not hasattr(self, '_color_map'):
-            self._color_map = {
-                "Up": "blue", "Down": "orange", "Left": "purple",
-                "Right": "green", "None": "red"
-            }
-            self._style_template = "font-size: 16px; font-weight: bold; color: {};"
-
         # 更新界面显示
         self.ui.label_current_direction.setText(direction)
-        color = self._color_map.get(direction, "red")
-        self.ui.label_current_direction.setStyleSheet(self._style_template.format(color))
+        self.ui.label_current_direction.setStyleSheet(
+            self._DIR_STYLES.get(direction, self._DIR_STYLE_DEFAULT))
 
         # 如果正在测试，处理测试逻辑
         if self.is_testing:
@@ -1142,8 +1324,8 @@ class VisionMainWindow(QMainWindow):
         """更新手势状态"""
         try:
             self.ui.label_gesture_status.setText(str(status))
-        except Exception as e:
-            print(f"更新手势状态失败: {e}")
+        except Exception:
+            logger.exception("更新手势状态失败")
             # 使用安全的方式更新状态
             try:
                 self.ui.label_gesture_status.setText("状态更新失败")
@@ -1167,8 +1349,8 @@ class VisionMainWindow(QMainWindow):
         self.generate_new_test()
         self.test_timer.start(100)  # 100ms检查一次
 
-        self.ui.textEdit_results.append("=== 视力测试开始 ===")
-        self.ui.textEdit_results.append("🎤 现在可以使用语音指向方向：向上、向下、向左、向右")
+        self._append_line("=== 视力测试开始 ===")
+        self._append_line("🎤 现在可以使用语音指向方向：向上、向下、向左、向右")
         self.ui.label_status.setText("状态: 测试进行中...")
 
     def stop_test(self):
@@ -1185,15 +1367,12 @@ class VisionMainWindow(QMainWindow):
 
         self.calculate_final_result()
         self.ui.label_status.setText("状态: 测试已停止")
-        self.ui.textEdit_results.append("🎤 现在可以使用语音控制：开始测试、停止测试")
+        self._append_line("🎤 现在可以使用语音控制：开始测试、停止测试")
     
     def generate_new_test(self):
         """生成新的测试项目"""
-        import random
-
         # 随机选择方向
-        directions = ["Up", "Down", "Left", "Right"]
-        self.current_direction = random.choice(directions)
+        self.current_direction = random.choice(self._TEST_DIRECTIONS)
 
         # 计算E字母大小
         width, height = self.vision_calculator.calculate_e_size(
@@ -1203,32 +1382,34 @@ class VisionMainWindow(QMainWindow):
         self.e_letter_widget.set_letter_params(width, self.current_direction)
 
         # 重置计时
-        self.test_start_time = time.time()
+        self.test_start_time = time.monotonic()
+        self._timeout_deadline = self.test_start_time + 7.0
         self.correct_start_time = 0
 
-        self.ui.textEdit_results.append(f"视力 {self.current_vision}: {self.current_direction}")
-        self.ui.textEdit_results.append("请指向E字开口方向")
+        self._append_line(f"视力 {self.current_vision}: {self.current_direction}")
+        self._append_line("请指向E字开口方向")
 
     def handle_test_direction(self, direction):
         """处理测试中的方向检测"""
         if not self.is_testing:
             return
 
-        current_time = time.time()
+        current_time = time.monotonic()
 
         if direction == self.current_direction:
             # 方向正确
             if self.correct_start_time == 0:
                 self.correct_start_time = current_time
-                self.ui.textEdit_results.append(f"开始正确指向: {direction}")
+                self._success_deadline = current_time + 2.0
+                self._append_line(f"开始正确指向: {direction}")
         else:
             # 方向错误，重置计时
             if self.correct_start_time > 0:
-                self.ui.textEdit_results.append(f"方向改变: {direction} (需要: {self.current_direction})")
+                self._append_line(f"方向改变: {direction} (需要: {self.current_direction})")
             self.correct_start_time = 0
 
-        # 检查5秒超时
-        if current_time - self.test_start_time >= 7.0:
+        # 检查超时
+        if current_time >= self._timeout_deadline:
             self.handle_test_timeout()
     
     def handle_test_success(self):
@@ -1238,16 +1419,16 @@ class VisionMainWindow(QMainWindow):
         self.test_results.append((self.current_vision, True))
         self.consecutive_failures = 0
 
-        self.ui.textEdit_results.append(f"✓ 视力 {self.current_vision} 测试成功")
+        self._append_line(f"✓ 视力 {self.current_vision} 测试成功")
 
         # 获取下一个视力级别
         next_vision = self.vision_calculator.get_next_vision_level(self.current_vision, True, {})
         if next_vision is None:
-            self.ui.textEdit_results.append("已达到最高视力级别")
+            self._append_line("已达到最高视力级别")
             self.complete_test()
         else:
             self.current_vision = next_vision
-            self.ui.textEdit_results.append(f"进入下一级别: {self.current_vision}")
+            self._append_line(f"进入下一级别: {self.current_vision}")
             self.generate_new_test()
 
     def handle_test_timeout(self):
@@ -1257,7 +1438,7 @@ class VisionMainWindow(QMainWindow):
         self.test_results.append((self.current_vision, False))
         self.consecutive_failures += 1
 
-        self.ui.textEdit_results.append(f"✗ 视力 {self.current_vision} 测试失败（超时）")
+        self._append_line(f"✗ 视力 {self.current_vision} 测试失败（超时）")
 
         # 检查是否测试完成
         if self.vision_calculator.is_test_complete(self.current_vision, self.consecutive_failures):
@@ -1268,7 +1449,7 @@ class VisionMainWindow(QMainWindow):
                 self.complete_test()
             else:
                 self.current_vision = next_vision
-                self.ui.textEdit_results.append(f"进入下一级别: {self.current_vision}")
+                self._append_line(f"进入下一级别: {self.current_vision}")
                 self.generate_new_test()
 
     def complete_test(self):
@@ -1284,13 +1465,13 @@ class VisionMainWindow(QMainWindow):
             self.voice_controller.set_test_mode(False)
 
         self.calculate_final_result()
-        self.ui.textEdit_results.append("🎤 现在可以使用语音控制：开始测试、停止测试")
+        self._append_line("🎤 现在可以使用语音控制：开始测试、停止测试")
         self.ui.label_status.setText("状态: 测试完成")
     
     def calculate_final_result(self):
         """计算最终结果"""
         if not self.test_results:
-            self.ui.textEdit_results.append("没有有效的测试结果")
+            self._append_line("没有有效的测试结果")
             return
 
         final_vision = self.vision_calculator.calculate_final_vision(self.test_results)
@@ -1306,81 +1487,89 @@ class VisionMainWindow(QMainWindow):
             assessment = "视力下降明显"
             suggestion = "建议及时到眼科医院进行详细检查"
 
-        results = [
-            "=== 测试结果 ===",
-            f"最终视力值: {final_vision}",
-            "\n测试过程:"
-        ]
-
-        for i, (vision, success) in enumerate(self.test_results, 1):
-            result = "成功" if success else "失败"
-            results.append(f"  {i}. 视力 {vision}: {result}")
-
-        results.extend([
-            f"\n视力评估: {assessment}",
+        process = "\n".join(
+            f"  {i}. 视力 {vision}: {'成功' if success else '失败'}"
+            for i, (vision, success) in enumerate(self.test_results, 1)
+        )
+        result_block = (
+            f"=== 测试结果 ===\n"
+            f"最终视力值: {final_vision}\n"
+            f"\n测试过程:\n"
+            f"{process}\n"
+            f"\n视力评估: {assessment}\n"
             f"建议: {suggestion}"
-        ])
+        )
 
-        self.ui.textEdit_results.append('\n'.join(results))
-
-        # 添加AI诊断
-        self.add_ai_diagnosis()
+        # 结果与AI诊断的开头信息一并写入
+        self.add_ai_diagnosis([result_block])
 
     def check_test_progress(self):
         """检查测试进度"""
         if not self.is_testing:
             return
+        # 窗口最小化或E字母区域不可见时只跳过状态文本刷新，判定照常进行
+        show_status = not self.isMinimized() and self.e_letter_widget.isVisible()
 
-        current_time = time.time()
-        elapsed = current_time - self.test_start_time
+        current_time = time.monotonic()
 
         # 检查是否达到成功条件
         if self.correct_start_time > 0:
-            correct_duration = current_time - self.correct_start_time
-            self.ui.label_status.setText(f"正确指向 {correct_duration:.1f}s / 2.0s")
-
             # 检查是否达到2秒成功条件
-            if correct_duration >= 2.0:
+            if current_time >= self._success_deadline:
                 self.handle_test_success()
                 return
-        else:
+            if show_status:
+                correct_duration = current_time - self.correct_start_time
+                self.ui.label_status.setText(f"正确指向 {correct_duration:.1f}s / 2.0s")
+        elif show_status:
             self.ui.label_status.setText(f"等待正确指向 {self.current_direction}...")
 
-        # 检查5秒超时
-        if elapsed >= 7.0:
+        # 检查超时
+        if current_time >= self._timeout_deadline:
             self.handle_test_timeout()
 
-    def add_ai_diagnosis(self):
-        """添加AI诊断分析（异步版本）"""
+    def add_ai_diagnosis(self, lines=None):
+        """添加AI诊断分析（异步版本）
+
+        Args:
+            lines: 需要在诊断信息之前一并写入的文本行（如测试结果）
+        """
+        lines = list(lines) if lines else []
         try:
-            self.ui.textEdit_results.append("\n=== AI智能诊断分析 ===")
+            lines.append("\n=== AI智能诊断分析 ===")
 
             # 检查API密钥配置
             if not is_api_key_configured():
-                self.ui.textEdit_results.append("⚠️ 未配置SiliconFlow API密钥，使用基础诊断模式")
-                self.ui.textEdit_results.append("\n如需使用AI智能诊断，请配置API密钥：")
-                self.ui.textEdit_results.append(get_api_setup_instructions())
+                lines += [
+                    "⚠️ 未配置SiliconFlow API密钥，使用基础诊断模式",
+                    "\n如需使用AI智能诊断，请配置API密钥：",
+                    get_api_setup_instructions(),
+                ]
+                self._log_lines(lines)
                 return
 
             # 显示开始信息
-            self.ui.textEdit_results.append("🤖 正在启动AI诊断服务...")
-            self.ui.textEdit_results.append("⏳ 请稍候，AI正在分析您的视力测试数据...")
+            lines += ["🤖 正在启动AI诊断服务...", "⏳ 请稍候，AI正在分析您的视力测试数据..."]
+            self._log_lines(lines)
+            lines = []
 
             # 初始化流式显示状态
             self._stream_displayed = False
-            self._stream_content = ""
-            self._ai_diagnosis_start_pos = len(self.ui.textEdit_results.toPlainText())
+            self._stream_cursor = None
+            self._ai_diagnosis_start_pos = self.ui.textEdit_results.document().characterCount() - 1
 
             # 创建并启动AI诊断线程
             if self.ai_diagnosis_thread and self.ai_diagnosis_thread.isRunning():
                 self.ai_diagnosis_thread.stop()
 
-            self.ai_diagnosis_thread = AIDiagnosisThread(self.ai_diagnosis, self.test_results)
+            self.ai_diagnosis_thread = AIDiagnosisThread(self._ensure_ai_diagnosis(), self.test_results)
 
             # 连接信号
             self.ai_diagnosis_thread.progress_updated.connect(self.on_ai_progress_update)
             self.ai_diagnosis_thread.stream_started.connect(self.on_ai_stream_started)
-            self.ai_diagnosis_thread.stream_content.connect(self.on_ai_stream_content)
+            # 跨线程信号显式排队，槽函数只接收已合并好的文本
+            self.ai_diagnosis_thread.stream_content.connect(
+                self.on_ai_stream_content, Qt.ConnectionType.QueuedConnection)
             self.ai_diagnosis_thread.stream_ended.connect(self.on_ai_stream_ended)
             self.ai_diagnosis_thread.diagnosis_completed.connect(self.on_ai_diagnosis_completed)
             self.ai_diagnosis_thread.diagnosis_failed.connect(self.on_ai_diagnosis_failed)
@@ -1389,102 +1578,143 @@ class VisionMainWindow(QMainWindow):
             self.ai_diagnosis_thread.start()
 
         except Exception as e:
-            self.ui.textEdit_results.append(f"\n❌ AI诊断启动失败: {str(e)}")
-            self.ui.textEdit_results.append("请参考上述基础评估结果。")
+            # 尚未写入的行与错误提示一起输出
+            lines += [f"\n❌ AI诊断启动失败: {str(e)}", "请参考上述基础评估结果。"]
+            self._log_lines(lines)
 
     def on_ai_progress_update(self, message):
         """AI进度更新回调"""
-        # 更新最后一行的进度信息
-        current_text = self.ui.textEdit_results.toPlainText()
-        lines = current_text.split('\n')
+        # 更新最后一行的进度信息：只读取并替换最后一段，不重建整个文档
+        last_line = self.ui.textEdit_results.document().lastBlock().text()
 
         # 如果最后一行是进度信息，则替换它
-        if lines and ('正在启动' in lines[-1] or '正在调用' in lines[-1] or '尝试' in lines[-1]):
-            lines[-1] = f"📡 {message}"
-            self.ui.textEdit_results.setPlainText('\n'.join(lines))
+        if '正在启动' in last_line or '正在调用' in last_line or '尝试' in last_line:
+            cursor = self._results_cursor
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock,
+                                QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+            cursor.insertText(f"📡 {message}")
         else:
-            self.ui.textEdit_results.append(f"📡 {message}")
+            self._append_line(f"📡 {message}")
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def on_ai_stream_started(self):
         """AI流式输出开始"""
-        self.ui.textEdit_results.append("\n🌊 开始接收AI诊断结果...")
+        self._append_line("\n🌊 开始接收AI诊断结果...")
         self._stream_displayed = True
-        self._stream_content = ""
 
-        # 记录流式内容开始位置
-        current_text = self.ui.textEdit_results.toPlainText()
-        self._stream_start_marker = "🌊 开始接收AI诊断结果..."
+        # 在开始标记之后放置一个独立的插入光标，后续内容逐段插入，无需重建整个文档
+        self._stream_cursor = QTextCursor(self.ui.textEdit_results.document())
+        self._stream_cursor.movePosition(QTextCursor.MoveOperation.End)
+        self._stream_cursor.insertText("\n\n")
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def on_ai_stream_content(self, content):
-        """AI流式内容更新"""
-        self._stream_content += content
-
-        # 实时更新显示
-        current_text = self.ui.textEdit_results.toPlainText()
-        start_pos = current_text.rfind(self._stream_start_marker)
-
-        if start_pos != -1:
-            # 保留开始标记之前的内容
-            before_stream = current_text[:start_pos + len(self._stream_start_marker)]
-            # 添加流式内容
-            new_text = before_stream + "\n\n" + self._stream_content
-            self.ui.textEdit_results.setPlainText(new_text)
+        """AI流式内容更新：先缓存，由定时器合并写入"""
+        self._stream_pending.append(content)
+        if not self._stream_flush_timer.isActive():
+            self._stream_flush_timer.start()
+
+    def _flush_ai_stream(self):
+        """将缓存的流式内容一次性写入结果区"""
+        if not self._stream_pending:
+            return
+        content = "".join(self._stream_pending)
+        self._stream_pending.clear()
+
+        if self._stream_cursor is None:
+            # 未收到开始信号时直接追加
+            self._append_line(content)
         else:
-            # 如果找不到标记，直接追加
-            self.ui.textEdit_results.append(content)
+            # 一段内容只做一次插入，期间暂停重绘
+            self.ui.textEdit_results.setUpdatesEnabled(False)
+            self._stream_cursor.insertText(content)
+            self.ui.textEdit_results.setUpdatesEnabled(True)
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def on_ai_stream_ended(self):
         """AI流式输出结束"""
+        # 先写入尚未刷新的内容
+        self._stream_flush_timer.stop()
+        self._flush_ai_stream()
+
         # 添加完成标记
-        current_text = self.ui.textEdit_results.toPlainText()
-        final_text = current_text + "\n\n✅ AI诊断完成"
-        self.ui.textEdit_results.setPlainText(final_text)
+        if self._stream_cursor is not None:
+            self._stream_cursor.insertText("\n\n✅ AI诊断完成")
+            self._stream_cursor = None
+        else:
+            self._append_line("\n✅ AI诊断完成")
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def on_ai_diagnosis_completed(self, diagnosis):
         """AI诊断完成回调"""
         # 如果没有通过流式显示，则直接显示结果
         if not self._stream_displayed:
-            self.ui.textEdit_results.append("\n" + diagnosis)
-            self.ui.textEdit_results.append("\n✅ AI诊断完成")
+            self._append_line("\n" + diagnosis)
+            self._append_line("\n✅ AI诊断完成")
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def on_ai_diagnosis_failed(self, error_message):
         """AI诊断失败回调"""
-        self.ui.textEdit_results.append(f"\n❌ AI诊断分析失败: {error_message}")
-        self.ui.textEdit_results.append("请参考上述基础评估结果。")
+        self._append_line(f"\n❌ AI诊断分析失败: {error_message}")
+        self._append_line("请参考上述基础评估结果。")
 
         # 滚动到底部
-        scrollbar = self.ui.textEdit_results.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self._scroll_results_to_bottom()
 
     def flash_background(self, color):
-        """闪烁背景颜色"""
-        self.e_letter_widget.set_background_color(color)
-        self.flash_timer.start(500)  # 500ms后恢复
+        """闪烁背景颜色：500ms内由指定颜色渐变回白色"""
+        anim = self._flash_anim
+        anim.stop()
+        anim.setStartValue(ELetterWidget._BG_COLORS.get(color, ELetterWidget._BG_COLORS["white"]))
+        anim.start()
     
     def reset_background(self):
         """重置背景颜色"""
+        if self._flash_anim is not None:
+            self._flash_anim.stop()
+        # 只切换调色板；控件不可见时Qt不会产生重绘
         self.e_letter_widget.set_background_color("white")
-        self.flash_timer.stop()
+
+    def eventFilter(self, obj, event):
+        """记录摄像头标签的尺寸变化"""
+        if obj is self.ui.label_camera and event.type() == QEvent.Type.Resize:
+            self._camera_label_size = QSize(event.size())
+        return super().eventFilter(obj, event)
+
+    def changeEvent(self, event):
+        """窗口状态变化：最小化时暂停定时器，恢复时继续"""
+        super().changeEvent(event)
+        if event.type() != QEvent.Type.WindowStateChange:
+            return
+        if self.isMinimized():
+            self._test_timer_paused = self.test_timer.isActive()
+            self._minimized_at = time.monotonic()
+            self.test_timer.stop()
+            if (self._flash_anim is not None
+                    and self._flash_anim.state() == QAbstractAnimation.State.Running):
+                self.reset_background()
+        elif self._test_timer_paused:
+            self._test_timer_paused = False
+            # 最小化期间用户看不到测试，所有计时顺延这段时间
+            paused = time.monotonic() - self._minimized_at
+            self.test_start_time += paused
+            self._timeout_deadline += paused
+            if self.correct_start_time > 0:
+                self.correct_start_time += paused
+                self._success_deadline += paused
+            self.test_timer.start(100)
     
     def update_distance(self, distance):
         """更新距离信息"""
@@ -1529,24 +1759,20 @@ class VisionMainWindow(QMainWindow):
     def show_camera_settings(self):
         """显示摄像头设置"""
         try:
-            dialog = SettingsDialog(self)
             # 切换到摄像头设置标签页
-            dialog.tab_widget.setCurrentIndex(1)
-            dialog.exec()
+            self._exec_settings_dialog(1)
         except Exception as e:
-            print(f"打开设置对话框失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 打开设置失败: {str(e)}")
+            logger.exception("打开设置对话框失败")
+            self._append_line(f"❌ 打开设置失败: {str(e)}")
 
     def show_gesture_settings(self):
         """显示手势识别设置"""
         try:
-            dialog = SettingsDialog(self)
             # 切换到系统设置标签页（包含手势识别参数）
-            dialog.tab_widget.setCurrentIndex(3)
-            dialog.exec()
+            self._exec_settings_dialog(3)
         except Exception as e:
-            print(f"打开设置对话框失败: {e}")
-            self.ui.textEdit_results.append(f"❌ 打开设置失败: {str(e)}")
+            logger.exception("打开设置对话框失败")
+            self._append_line(f"❌ 打开设置失败: {str(e)}")
 
     # 已移除测试设置方法
 
@@ -1554,12 +1780,12 @@ class VisionMainWindow(QMainWindow):
         """应用医疗主题样式"""
         try:
             # 设置应用程序图标
-            app_icon = resource_manager.get_icon('app')
+            app_icon = get_resource_manager().get_icon('app')
             if not app_icon.isNull():
                 self.setWindowIcon(app_icon)
 
             # 加载并应用样式表
-            stylesheet = resource_manager.load_stylesheet()
+            stylesheet = get_resource_manager().load_stylesheet()
             if stylesheet:
                 self.setStyleSheet(stylesheet)
 
@@ -1569,8 +1795,8 @@ class VisionMainWindow(QMainWindow):
             # 设置窗口标题
             self.setWindowTitle("电子视力系统 - 专业版")
 
-        except Exception as e:
-            print(f"应用医疗主题失败: {e}")
+        except Exception:
+            logger.exception("应用医疗主题失败")
 
     def apply_button_icons(self):
         """为按钮应用图标"""
@@ -1583,20 +1809,21 @@ class VisionMainWindow(QMainWindow):
             for button_name, icon_name in button_icons.items():
                 if hasattr(self.ui, button_name):
                     button = getattr(self.ui, button_name)
-                    resource_manager.apply_button_icon(button, icon_name, (20, 20))
+                    get_resource_manager().apply_button_icon(button, icon_name, (20, 20))
 
-        except Exception as e:
-            print(f"应用按钮图标失败: {e}")
+        except Exception:
+            logger.exception("应用按钮图标失败")
 
-    def closeEvent(self, event):
-        """关闭事件"""
-        # 停止AI诊断线程
-        if self.ai_diagnosis_thread and self.ai_diagnosis_thread.isRunning():
-            self.ai_diagnosis_thread.stop()
+    def _release_devices(self):
+        """释放摄像头、语音控制与通信资源（只执行一次）"""
+        if self._devices_released:
+            return
+        self._devices_released = True
 
         # 停止摄像头
         if self.camera_handler:
             self.camera_handler.stop_camera()
+        CameraWithGestureHandler.shutdown()
 
         # 断开通信
         if self.communication:
@@ -1606,6 +1833,33 @@ class VisionMainWindow(QMainWindow):
         if self.voice_controller:
             self.voice_controller.cleanup()
 
+    def _force_close(self):
+        """AI诊断线程超过期限仍未结束时强制终止并关闭窗口"""
+        thread = self.ai_diagnosis_thread
+        if thread is not None and thread.isRunning():
+            logger.warning("AI诊断线程未能及时结束，强制终止")
+            thread.terminate()
+            thread.wait()
+        self.close()
+
+    def closeEvent(self, event):
+        """关闭事件"""
+        # 先释放摄像头、麦克风等设备，不随AI诊断线程一起等待
+        self._release_devices()
+
+        # 停止AI诊断线程：只请求中断，线程结束后再次关闭，界面线程不阻塞等待
+        thread = self.ai_diagnosis_thread
+        if thread is not None and thread.isRunning():
+            if not self._close_pending:
+                self._close_pending = True
+                thread.stop(wait=False)
+                thread.finished.connect(self.close, Qt.ConnectionType.QueuedConnection)
+                # 兜底期限，与安全退出的轮询期限相同思路
+                QTimer.singleShot(self._CLOSE_THREAD_TIMEOUT_MS, self._force_close)
+            self.hide()
+            event.ignore()
+            return
+
         event.accept()
 
 def main():
@@ -1618,11 +1872,11 @@ def main():
 
         # 设置应用程序图标
         try:
-            app_icon = resource_manager.get_icon('app')
+            app_icon = get_resource_manager().get_icon('app')
             if not app_icon.isNull():
                 app.setWindowIcon(app_icon)
-        except Exception as e:
-            print(f"设置应用图标失败: {e}")
+        except Exception:
+            logger.exception("设置应用图标失败")
 
         # 创建主窗口
         main_window = VisionMainWindow()
@@ -1631,14 +1885,19 @@ def main():
         # 运行应用程序
         sys.exit(app.exec())
 
-    except Exception as e:
-        print(f"程序启动失败: {e}")
-        traceback.print_exc()
+    except Exception:
+        logger.exception("程序启动失败")
         # 确保在出错时也能正常退出
         try:
             sys.exit(1)
         except:
             pass
 
+def configure_logging():
+    """配置日志输出（main.py 与本模块两个入口共用，保证日志级别一致）"""
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
 if __name__ == "__main__":
+    configure_logging()
     main()
@@ -3,53 +3,88 @@
 管理应用程序的图标、图片和样式资源
 """
 import os
-from PySide6.QtGui import QIcon, QPixmap
+import functools
+from pathlib import Path
+from PySide6.QtGui import QIcon, QPixmap, QPixmapCache
 from PySide6.QtCore import Qt, QSize
 
 class ResourceManager:
     """资源管理器"""
-    
+
+    # 图标名称 -> 文件名
+    _ICON_FILES = {
+        'eye': 'eye.svg',
+        'camera': 'camera.svg',
+        'settings': 'settings.svg',
+        'start': 'start.svg',
+        'stop': 'stop.svg',
+        'ai': 'ai.svg',
+        'medical': 'medical.svg',
+        'app': 'app_icon.svg'
+    }
+
+    # 共享的空图标，缺失或未知的图标都返回它
+    _NULL_ICON = None
+
     def __init__(self):
+        if ResourceManager._NULL_ICON is None:
+            ResourceManager._NULL_ICON = QIcon()
+
         # 获取资源文件夹路径
         self.base_path = os.path.dirname(os.path.abspath(__file__))
         self.resources_path = os.path.join(self.base_path, "resources")
         self.icons_path = os.path.join(self.resources_path, "icons")
         self.images_path = os.path.join(self.resources_path, "images")
         self.styles_path = os.path.join(self.resources_path, "styles")
+
+        # 目录前缀只计算一次，取路径时直接拼接文件名
+        self._icons_prefix = os.path.normpath(self.icons_path) + os.sep
+        self._images_prefix = os.path.normpath(self.images_path) + os.sep
+        self._styles_prefix = os.path.normpath(self.styles_path) + os.sep
         
         # 确保资源文件夹存在
         self._ensure_directories()
+
+        # 样式表缓存：文件名 -> (修改时间, 内容)
+        self._stylesheet_cache = {}
+
+        # 已确认不存在的图片文件名，再次请求时不再访问磁盘
+        self._missing_images = set()
+
+        # 按钮图标尺寸缓存：(宽, 高) -> QSize
+        self._sizes_cache = {}
         
-        # 预加载常用图标
+        # 扫描图标目录；图标在首次使用时才加载
         self._preload_icons()
     
     def _ensure_directories(self):
         """确保资源目录存在"""
-        for path in [self.resources_path, self.icons_path, self.images_path, self.styles_path]:
-            if not os.path.exists(path):
+        # 一次扫描资源目录得到已有的子目录，只创建缺失的部分
+        try:
+            with os.scandir(self.resources_path) as entries:
+                existing = {entry.name for entry in entries if entry.is_dir()}
+        except FileNotFoundError:
+            os.makedirs(self.resources_path, exist_ok=True)
+            existing = set()
+
+        for sub, path in (("icons", self.icons_path),
+                          ("images", self.images_path),
+                          ("styles", self.styles_path)):
+            if sub not in existing:
                 os.makedirs(path, exist_ok=True)
     
     def _preload_icons(self):
-        """预加载常用图标"""
+        """扫描图标目录，记录现有的图标文件（QIcon延迟到 get_icon 时构造）"""
         self.icons = {}
-        icon_files = {
-            'eye': 'eye.svg',
-            'camera': 'camera.svg',
-            'settings': 'settings.svg',
-            'start': 'start.svg',
-            'stop': 'stop.svg',
-            'ai': 'ai.svg',
-            'medical': 'medical.svg',
-            'app': 'app_icon.svg'
-        }
-        
-        for name, filename in icon_files.items():
-            icon_path = os.path.join(self.icons_path, filename)
-            if os.path.exists(icon_path):
-                self.icons[name] = QIcon(icon_path)
-            else:
-                # 如果文件不存在，创建一个空图标
-                self.icons[name] = QIcon()
+        # 一次扫描图标目录得到现有文件集合，代替逐个文件的存在性检查
+        try:
+            with os.scandir(self.icons_path) as entries:
+                self._present_icon_files = {entry.name for entry in entries}
+        except OSError:
+            self._present_icon_files = set()
+        # 文件缺失的图标名称
+        self._null_icon_names = {name for name, filename in self._ICON_FILES.items()
+                                 if filename not in self._present_icon_files}
     
     def get_icon(self, name: str) -> QIcon:
         """
@@ -61,7 +96,13 @@ class ResourceManager:
         Returns:
             QIcon: 图标对象
         """
-        return self.icons.get(name, QIcon())
+        icon = self.icons.get(name)
+        if icon is None:
+            # 首次使用时才构造；未知或文件缺失的图标返回共享的空图标
+            if name not in self._ICON_FILES or name in self._null_icon_names:
+                return ResourceManager._NULL_ICON
+            icon = self.icons[name] = QIcon(self._icons_prefix + self._ICON_FILES[name])
+        return icon
     
     def get_icon_path(self, filename: str) -> str:
         """
@@ -73,7 +114,7 @@ class ResourceManager:
         Returns:
             str: 完整的文件路径
         """
-        return os.path.join(self.icons_path, filename)
+        return self._icons_prefix + filename
     
     def get_image_path(self, filename: str) -> str:
         """
@@ -85,7 +126,7 @@ class ResourceManager:
         Returns:
             str: 完整的文件路径
         """
-        return os.path.join(self.images_path, filename)
+        return self._images_prefix + filename
     
     def get_pixmap(self, filename: str, size: tuple = None) -> QPixmap:
         """
@@ -98,14 +139,24 @@ class ResourceManager:
         Returns:
             QPixmap: 像素图对象
         """
-        image_path = self.get_image_path(filename)
-        if os.path.exists(image_path):
-            pixmap = QPixmap(image_path)
-            if size:
-                pixmap = pixmap.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, 
-                                     Qt.TransformationMode.SmoothTransformation)
+        if filename in self._missing_images:
+            return QPixmap()
+
+        key = f"{filename}:{size[0]}x{size[1]}" if size else filename
+        pixmap = QPixmap()
+        if QPixmapCache.find(key, pixmap):
+            return pixmap
+
+        # 直接加载，文件缺失或无法解码时得到空像素图，无需预先检查文件是否存在
+        pixmap = QPixmap(self.get_image_path(filename))
+        if pixmap.isNull():
+            self._missing_images.add(filename)
             return pixmap
-        return QPixmap()
+        if size:
+            pixmap = pixmap.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, 
+                                 Qt.TransformationMode.SmoothTransformation)
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
     
     def load_stylesheet(self, filename: str = "medical_theme.qss") -> str:
         """
@@ -117,15 +168,25 @@ class ResourceManager:
         Returns:
             str: 样式表内容
         """
-        style_path = os.path.join(self.styles_path, filename)
-        if os.path.exists(style_path):
-            try:
-                with open(style_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except Exception as e:
-                print(f"加载样式表失败: {e}")
-                return ""
-        return ""
+        style_path = self._styles_prefix + filename
+        try:
+            mtime = os.stat(style_path).st_mtime
+        except OSError:
+            return ""
+
+        # 文件未修改时直接返回缓存的内容
+        cached = self._stylesheet_cache.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            # 一次性读入字节再解码，避免文本模式逐层包装带来的额外系统调用
+            content = Path(style_path).read_bytes().decode('utf-8')
+        except Exception as e:
+            print(f"加载样式表失败: {e}")
+            return ""
+        self._stylesheet_cache[filename] = (mtime, content)
+        return content
     
     def apply_button_icon(self, button, icon_name: str, size: tuple = (24, 24)):
         """
@@ -138,8 +199,12 @@ class ResourceManager:
         """
         icon = self.get_icon(icon_name)
         if not icon.isNull():
+            key = (size[0], size[1])
+            qsize = self._sizes_cache.get(key)
+            if qsize is None:
+                qsize = self._sizes_cache[key] = QSize(size[0], size[1])
             button.setIcon(icon)
-            button.setIconSize(QSize(size[0], size[1]))
+            button.setIconSize(qsize)
     
     def get_available_icons(self) -> list:
         """
@@ -148,7 +213,7 @@ class ResourceManager:
         Returns:
             list: 可用图标名称列表
         """
-        return list(self.icons.keys())
+        return list(self._ICON_FILES)
     
     def icon_exists(self, name: str) -> bool:
         """
@@ -160,7 +225,17 @@ class ResourceManager:
         Returns:
             bool: 图标是否存在
         """
-        return name in self.icons and not self.icons[name].isNull()
+        return name in self._ICON_FILES and name not in self._null_icon_names
+
+@functools.lru_cache(maxsize=None)
+def get_resource_manager() -> ResourceManager:
+    """获取全局资源管理器（只构造一次）"""
+    return ResourceManager()
 
-# 全局资源管理器实例
-resource_manager = ResourceManager()
+def __getattr__(name):
+    """全局资源管理器实例 resource_manager 在首次访问时才创建（PEP 562）"""
+    if name == "resource_manager":
+        global resource_manager
+        resource_manager = get_resource_manager()
+        return resource_manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
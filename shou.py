@@ -1,16 +1,30 @@
 import cv2
 import mediapipe as mp
 import math
+from collections import namedtuple
+
+# 手势判断用到的关键点：食指尖端(8)、食指根部(5)、中指第二关节(10)、手腕(0)
+FingerFeatures = namedtuple('FingerFeatures', ['index_tip', 'index_mcp', 'middle_pip', 'wrist'])
+
+def extract_finger_features(hand_landmarks):
+    '''
+        一次性提取手势判断所需的关键点，供多个判断函数共用
+    '''
+    if isinstance(hand_landmarks, FingerFeatures):
+        return hand_landmarks
+    return FingerFeatures(hand_landmarks[8], hand_landmarks[5], hand_landmarks[10], hand_landmarks[0])
 
 def get_finger_direction(hand_landmarks):
     '''
         检测食指指向方向
         使用食指关键点计算方向向量
+        参数可以是21个关键点，也可以是extract_finger_features的结果
     '''
+    features = extract_finger_features(hand_landmarks)
     # 食指关键点索引：5(MCP), 6(PIP), 7(DIP), 8(TIP)
     # 使用MCP到TIP的向量来确定方向
-    mcp = hand_landmarks[5]  # 食指根部
-    tip = hand_landmarks[8]  # 食指尖端
+    mcp = features.index_mcp  # 食指根部
+    tip = features.index_tip  # 食指尖端
 
     # 计算方向向量
     direction_x = tip[0] - mcp[0]
@@ -33,13 +47,15 @@ def is_index_finger_extended(hand_landmarks):
     '''
         简单检测食指是否伸出
         通过比较食指尖端和中指关节的位置来判断
+        参数可以是21个关键点，也可以是extract_finger_features的结果
     '''
+    features = extract_finger_features(hand_landmarks)
     # 食指尖端
-    index_tip = hand_landmarks[8]
+    index_tip = features.index_tip
     # 中指第二关节
-    middle_pip = hand_landmarks[10]
+    middle_pip = features.middle_pip
     # 手腕
-    wrist = hand_landmarks[0]
+    wrist = features.wrist
 
     # 计算食指尖端到手腕的距离
     index_distance = math.sqrt((index_tip[0] - wrist[0])**2 + (index_tip[1] - wrist[1])**2)